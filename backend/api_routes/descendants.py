@@ -1,11 +1,19 @@
-import mmap, json
 import logging
+import orjson
 import time
 import unicodedata
+from itertools import islice
 from fastapi import APIRouter, Query
-from fastapi.responses import JSONResponse
-from constants import index, JSONL_FILE_PATH, REVERSE_DESCENDANT_GRAPH_FILE_PATH
-from services.wiktionary_io import find_root_ancestor, build_descendant_hierarchy, _extract_child_ref_from_descendant
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from constants import index, index_key, word_to_keys, REVERSE_DESCENDANT_GRAPH_FILE_PATH, load_entry_by_offset, read_entry_line
+from services.wiktionary_io import find_root_ancestor, descendant_hierarchy, _extract_child_ref_from_descendant
+
+try:
+    import simdjson
+    # One reusable parser; documents must not outlive the next `parse()` call.
+    _simdjson_parser = simdjson.Parser()
+except ImportError:  # pragma: no cover - optional accelerator
+    _simdjson_parser = None
 
 logger = logging.getLogger("descendants_api")
 logging.basicConfig(level=logging.INFO)
@@ -50,21 +58,12 @@ def _add_elapsed_ms(payload: dict, started_at: float):
     meta["elapsed_ms"] = round((time.perf_counter() - started_at) * 1000, 1)
     return payload
 
-def _offset_from_index_value(val):
-    """Return an integer file offset for an index value which may be int or list/tuple."""
-    if isinstance(val, (list, tuple)):
-        if not val:
-            raise ValueError("empty index offset list")
-        return val[0]
-    return int(val)
-
 def _find_index_key_for(w: str):
-    """Best-effort: find any index key that starts with the provided word + '_' (case-insensitive)."""
+    """Best-effort: find the first index key for the provided word (case-insensitive)."""
     for variant in _index_word_variants(w):
-        wk = f"{variant}_"
-        for k in index:
-            if k.startswith(wk):
-                return k
+        keys = word_to_keys.get(variant)
+        if keys:
+            return keys[0]
     return None
 
 
@@ -81,10 +80,7 @@ def _find_index_keys_for_word(w: str, lang_code: str = None, max_keys: int = 200
                 exact_bare = f"{bare_variant}_{lang_key}"
                 if exact_bare in index and exact_bare not in out:
                     return [exact_bare]
-        wk = f"{variant}_"
-        for k in index:
-            if not k.startswith(wk):
-                continue
+        for k in word_to_keys.get(variant, ()):
             if k not in out:
                 out.append(k)
             if len(out) >= max_keys:
@@ -153,8 +149,8 @@ def _load_reverse_descendant_graph():
         return _reverse_descendant_graph
 
     try:
-        with open(REVERSE_DESCENDANT_GRAPH_FILE_PATH, "r", encoding="utf-8") as f:
-            graph = json.load(f)
+        with open(REVERSE_DESCENDANT_GRAPH_FILE_PATH, "rb") as f:
+            graph = orjson.loads(f.read())
             _reverse_descendant_graph = {str(key): set(value or []) for key, value in graph.items()}
     except Exception as exc:
         logger.warning("Failed to build reverse descendant graph: %s", exc)
@@ -163,6 +159,15 @@ def _load_reverse_descendant_graph():
     return _reverse_descendant_graph
 
 
+def load_reverse_descendant_graph():
+    """Load the precomputed reverse descendant graph (lifespan startup)."""
+    global _reverse_descendant_graph
+    _reverse_descendant_graph = None
+    graph = _load_reverse_descendant_graph()
+    logger.info("Loaded reverse descendant graph with %d parents", len(graph))
+    return graph
+
+
 def _reverse_graph_child_keys(word: str, lang_code: str | None):
     graph = _load_reverse_descendant_graph()
     child_keys = set()
@@ -171,9 +176,25 @@ def _reverse_graph_child_keys(word: str, lang_code: str | None):
     return sorted(child_keys)
 
 
-def _reverse_tree_node(word: str, lang_code: str | None, max_depth: int, node_budget: dict, depth: int = 0, seen: set | None = None):
+def _reverse_tree_node(
+    word: str,
+    lang_code: str | None,
+    max_depth: int,
+    node_budget: dict,
+    depth: int = 0,
+    seen: set | None = None,
+    child_keys_cache: dict | None = None,
+):
+    """Expand `word` through the reverse descendant graph.
+
+    `seen` holds the keys on the current path (added before descending, removed after)
+    so cycles are cut without copying the set per branch. `child_keys_cache` memoizes
+    graph lookups for the request, since shared ancestors are reached via many paths.
+    """
     if seen is None:
         seen = set()
+    if child_keys_cache is None:
+        child_keys_cache = {}
 
     if depth >= max_depth:
         return {"word": word, "lang_code": lang_code, "expansion": None, "children": []}
@@ -183,22 +204,24 @@ def _reverse_tree_node(word: str, lang_code: str | None, max_depth: int, node_bu
         return {"word": word, "lang_code": lang_code, "expansion": None, "children": []}
 
     node = {"word": word, "lang_code": lang_code, "expansion": None, "children": []}
-    for child_key in _reverse_graph_child_keys(word, lang_code):
+    child_keys = child_keys_cache.get((word, lang_code))
+    if child_keys is None:
+        child_keys = child_keys_cache[(word, lang_code)] = _reverse_graph_child_keys(word, lang_code)
+    for child_key in child_keys:
         if node_budget.get("remaining", 0) <= 0:
             node_budget["truncated"] = True
             break
         if child_key in seen:
             continue
 
-        if "_" in child_key:
-            child_word, child_lang = child_key.rsplit("_", 1)
-        else:
+        child_word, sep, child_lang = child_key.rpartition("_")
+        if not sep:
             child_word, child_lang = child_key, None
 
         node_budget["remaining"] = max(0, node_budget.get("remaining", 0) - 1)
-        next_seen = set(seen)
-        next_seen.add(child_key)
-        child_node = _reverse_tree_node(child_word, child_lang, max_depth, node_budget, depth + 1, next_seen)
+        seen.add(child_key)
+        child_node = _reverse_tree_node(child_word, child_lang, max_depth, node_budget, depth + 1, seen, child_keys_cache)
+        seen.discard(child_key)
         node["children"].append(child_node)
 
     return node
@@ -229,13 +252,49 @@ def _index_word_variants(text: str):
     return variants
 
 
-def _read_entry_by_key(mm, key: str):
+def _deepest_template_ancestor(templates):
+    """Return ``(word, lang_code)`` of the deepest template naming an ancestor form.
+
+    The last template with an explicit ancestor (``args['3']``) wins; its
+    transliteration ``tr`` is preferred when present, which helps when the
+    ancestor is written in a non-Latin script.
+    """
+    # Scan from the end so the first hit is the deepest ancestor.
+    for tpl in reversed(templates or []):
+        if not tpl or not hasattr(tpl, "get"):
+            continue
+        args = tpl.get("args") or {}
+        if args.get("3"):
+            return args.get("tr") or args.get("3"), args.get("2")
+    return None, None
+
+
+def _read_etymology_root(off: int):
+    """Read the record at ``off`` and return ``(root_word, root_lang, entry)``.
+
+    With pysimdjson available only ``etymology_templates[*].args`` is pulled out of
+    the record; the full ``entry`` dict is materialized only when no template names
+    an ancestor, so callers can hand it to ``find_root_ancestor``. ``entry`` is
+    ``None`` whenever a template root was found.
+    """
+    line = read_entry_line(off)
+    if _simdjson_parser is None:
+        entry = orjson.loads(line)
+        root_word, root_lang = _deepest_template_ancestor(entry.get("etymology_templates"))
+        return root_word, root_lang, (None if root_word else entry)
+
+    doc = _simdjson_parser.parse(line)
+    root_word, root_lang = _deepest_template_ancestor(doc.get("etymology_templates"))
+    entry = None if root_word else doc.as_dict()
+    del doc
+    return root_word, root_lang, entry
+
+
+def _read_entry_by_key(key: str):
     if key not in index:
         return None
     try:
-        off = _offset_from_index_value(index[key])
-        mm.seek(off)
-        return json.loads(mm.readline().decode("utf-8"))
+        return load_entry_by_offset(index[key])
     except Exception:
         return None
 
@@ -254,7 +313,7 @@ def _is_proto_like(word, lang_code):
     return word_norm.startswith("*") or (lang_norm and "pro" in lang_norm)
 
 
-def _candidate_parent_nodes(mm, entry, max_per_step=8):
+def _candidate_parent_nodes(entry, max_per_step=8):
     """Extract immediate ancestor candidates from etymology templates.
 
     Returns unique candidate nodes in precedence order (deepest template first).
@@ -289,12 +348,12 @@ def _candidate_parent_nodes(mm, entry, max_per_step=8):
     return out
 
 
-def _trace_ancestry_paths(mm, start_key: str, max_depth=10, max_paths=20, max_branching=5):
+def _trace_ancestry_paths(start_key: str, max_depth=10, max_paths=20, max_branching=5):
     """Depth-limited DFS over etymology templates to discover root candidates.
 
     Returns paths as arrays of nodes from descendant -> ancestor/root.
     """
-    start_entry = _read_entry_by_key(mm, start_key)
+    start_entry = _read_entry_by_key(start_key)
     if not start_entry:
         return []
 
@@ -314,7 +373,7 @@ def _trace_ancestry_paths(mm, start_key: str, max_depth=10, max_paths=20, max_br
             paths.append(path)
             continue
 
-        parent_candidates = _candidate_parent_nodes(mm, current_entry, max_per_step=max_branching)
+        parent_candidates = _candidate_parent_nodes(current_entry, max_per_step=max_branching)
         if not parent_candidates:
             paths.append(path)
             continue
@@ -337,7 +396,7 @@ def _trace_ancestry_paths(mm, start_key: str, max_depth=10, max_paths=20, max_br
                     break
                 if p_key in seen_keys:
                     continue
-                p_entry = _read_entry_by_key(mm, p_key)
+                p_entry = _read_entry_by_key(p_key)
                 if not p_entry:
                     continue
                 advanced = True
@@ -351,7 +410,7 @@ def _trace_ancestry_paths(mm, start_key: str, max_depth=10, max_paths=20, max_br
     return paths[:max_paths]
 
 
-def _resolve_ancestor_roots(mm, word: str, lang_code: str, max_depth: int, max_paths: int, max_branching: int):
+def _resolve_ancestor_roots(word: str, lang_code: str, max_depth: int, max_paths: int, max_branching: int):
     start_keys = _find_index_keys_for_word(word, lang_code, max_keys=max_branching)
     if not start_keys:
         return [], []
@@ -361,7 +420,6 @@ def _resolve_ancestor_roots(mm, word: str, lang_code: str, max_depth: int, max_p
         if len(all_paths) >= max_paths:
             break
         sub_paths = _trace_ancestry_paths(
-            mm,
             s_key,
             max_depth=max_depth,
             max_paths=max_paths - len(all_paths),
@@ -410,35 +468,77 @@ def _resolve_ancestor_roots(mm, word: str, lang_code: str, max_depth: int, max_p
     return roots, all_paths
 
 
+def _iter_paths_from_tree(tree, root_word, root_lang=None):
+    """Yield root-to-leaf paths of `tree` in depth-first order.
+
+    Iterative DFS: every visited node is recorded once as `(node, parent_slot)` and a
+    path list is only built when a leaf is reached, by following parent slots back.
+    """
+    top_children = tree.get("children", []) if isinstance(tree, dict) else []
+    root_node = {"word": root_word, "lang_code": root_lang}
+    if not top_children:
+        yield [root_node]
+        return
+
+    visited = [(root_node, -1)]
+    stack = [(child, 0) for child in reversed(top_children)]
+    while stack:
+        node, parent_slot = stack.pop()
+        word = node.get("word") or node.get("name")
+        visited.append(({"word": word, "lang_code": node.get("lang_code"), "expansion": node.get("expansion")}, parent_slot))
+        slot = len(visited) - 1
+
+        children = node.get("children", []) or []
+        if children:
+            stack.extend((child, slot) for child in reversed(children))
+            continue
+
+        path = []
+        while slot != -1:
+            cur, slot = visited[slot]
+            path.append(cur)
+        path.reverse()
+        yield path
+
+
 def _flatten_paths_from_tree(tree, root_word, root_lang=None, max_paths=1000):
-    paths = []
+    """Return root-to-leaf paths of `tree` in depth-first order, at most `max_paths`."""
+    return list(islice(_iter_paths_from_tree(tree, root_word, root_lang), max_paths))
+
+
+def _ndjson_paths(root_word, root_lang, paths, meta):
+    """Yield a paths response as NDJSON: a root line, one line per path, then a meta line."""
+    yield orjson.dumps({"root": root_word, "root_lang": root_lang}) + b"\n"
+    count = 0
+    for path in paths:
+        count += 1
+        yield orjson.dumps(path) + b"\n"
+    meta = dict(meta, truncated=meta["truncated"] or count >= meta["max_paths"])
+    yield orjson.dumps({"meta": meta}) + b"\n"
+
 
-    def walk(node, acc):
-        if len(paths) >= max_paths:
-            return
-        cur = {
+def _ndjson_tree_nodes(root, tree, meta):
+    """Yield a descendant tree as NDJSON: a root line, one line per node, then a meta line.
+
+    Nodes are emitted in depth-first order with an integer `id` and the `parent` id
+    (None for the root), so clients can rebuild the hierarchy while it streams.
+    """
+    yield orjson.dumps({"root": root}) + b"\n"
+    next_id = 0
+    stack = [(tree, None)]
+    while stack:
+        node, parent_id = stack.pop()
+        node_id = next_id
+        next_id += 1
+        yield orjson.dumps({
+            "id": node_id,
+            "parent": parent_id,
             "word": node.get("word") or node.get("name"),
             "lang_code": node.get("lang_code"),
             "expansion": node.get("expansion"),
-        }
-        new_acc = acc + [cur]
-        children = node.get("children", []) or []
-        if not children:
-            paths.append(new_acc)
-            return
-        for c in children:
-            walk(c, new_acc)
-
-    top_children = tree.get("children", []) if isinstance(tree, dict) else []
-    root_node = {"word": root_word, "lang_code": root_lang}
-    if top_children:
-        for child in top_children:
-            if len(paths) >= max_paths:
-                break
-            walk(child, [root_node])
-    else:
-        paths.append([root_node])
-    return paths
+        }) + b"\n"
+        stack.extend((child, node_id) for child in reversed(node.get("children") or []))
+    yield orjson.dumps({"meta": meta}) + b"\n"
 
 
 def _aggregate_descendant_tree(node, branch_limit: int = 8, max_depth: int = 4, depth: int = 0):
@@ -455,7 +555,8 @@ def _aggregate_descendant_tree(node, branch_limit: int = 8, max_depth: int = 4,
 
     for idx, child in enumerate(children):
         if depth >= max_depth:
-            next_children = children
+            # Copy: the summary marker below must not be appended to the input tree.
+            next_children = list(children)
             break
         if idx < branch_limit:
             next_children.append(
@@ -494,60 +595,47 @@ async def get_descendant_tree(
     lang_code: str,
     max_depth: int = Query(8, ge=1, le=30),
     max_nodes: int = Query(1200, ge=10, le=20000),
+    stream: bool = Query(False),
 ):
     """Return a descendant tree for the provided word+lang_code.
-    The response is the tree object (JSON-serializable dict)."""
-    key = f"{word.lower()}_{lang_code.lower()}"
+    The response is the tree object (JSON-serializable dict), or with `stream=true`
+    NDJSON lines of flat nodes linked by `id`/`parent`."""
+    key = index_key(word, lang_code)
     if key not in index:
-        return JSONResponse(content={"error": "Word not found."}, status_code=404)
-    mm = None
+        return ORJSONResponse(content={"error": "Word not found."}, status_code=404)
     started_at = time.perf_counter()
     try:
-        with open(JSONL_FILE_PATH, "r", encoding="utf-8") as f:
-            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
-            off = _offset_from_index_value(index[key])
-            mm.seek(off)
-            entry = json.loads(mm.readline().decode("utf-8"))
-
-            # Prefer the deepest explicit etymology template ancestor (args['3'] or transliteration 'tr').
-            root = None
-            templates = entry.get("etymology_templates", []) or []
-            deepest_tpl = None
-            for tpl in templates:
-                if not tpl or not isinstance(tpl, dict):
-                    continue
-                args = tpl.get("args") or {}
-                if args.get("3"):
-                    deepest_tpl = tpl
-
-            if deepest_tpl:
-                args = deepest_tpl.get("args") or {}
-                cand_word = args.get("3")
-                tr = args.get("tr")
-                root = tr or cand_word
-            if not root:
-                # Fallback to existing helper
-                root = find_root_ancestor(entry, mm)
-
-            logger.info("/descendant-tree request word=%s lang=%s -> root=%s (chosen)", word, lang_code, root)
-            budget = {"remaining": max_nodes, "truncated": False}
-            tree = build_descendant_hierarchy(root, mm, lang_code=lang_code, max_depth=max_depth, node_budget=budget)
-            logger.info("/descendant-tree built tree for root=%s children=%d", root, len(tree.get("children", [])))
-            payload = {
-                "root": root,
-                "tree": tree,
-                "meta": {
-                    "max_depth": max_depth,
-                    "max_nodes": max_nodes,
-                    "truncated": bool(budget.get("truncated")),
-                },
-            }
-            return _add_elapsed_ms(payload, started_at)
+        off = index[key]
+
+        # Prefer the deepest explicit etymology template ancestor (args['3'] or transliteration 'tr').
+        root, _, entry = _read_etymology_root(off)
+        if not root:
+            # Fallback to existing helper
+            root = find_root_ancestor(entry)
+
+        logger.info("/descendant-tree request word=%s lang=%s -> root=%s (chosen)", word, lang_code, root)
+        tree, truncated = descendant_hierarchy(
+            root,
+            lang_code=lang_code,
+            max_depth=max_depth,
+            max_nodes=max_nodes,
+        )
+        logger.info("/descendant-tree built tree for root=%s children=%d", root, len(tree.get("children", [])))
+        meta = {
+            "max_depth": max_depth,
+            "max_nodes": max_nodes,
+            "truncated": truncated,
+        }
+        if stream:
+            return StreamingResponse(_ndjson_tree_nodes(root, tree, meta), media_type="application/x-ndjson")
+        payload = {
+            "root": root,
+            "tree": tree,
+            "meta": meta,
+        }
+        return ORJSONResponse(_add_elapsed_ms(payload, started_at))
     except Exception as e:
-        return JSONResponse(content={"error": str(e)}, status_code=500)
-    finally:
-        if mm is not None:
-            mm.close()
+        return ORJSONResponse(content={"error": str(e)}, status_code=500)
 
 @router.get("/descendant-tree-from-root")
 async def descendant_tree_from_root(
@@ -557,39 +645,34 @@ async def descendant_tree_from_root(
     max_nodes: int = Query(1200, ge=10, le=20000),
 ):
     """Build a descendant tree starting from an explicit root word (optionally with lang_code)."""
-    mm = None
     started_at = time.perf_counter()
     try:
-        with open(JSONL_FILE_PATH, "r", encoding="utf-8") as f:
-            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
-            logger.info("/descendant-tree-from-root request root=%s lang=%s", word, lang_code)
-            budget = {"remaining": max_nodes, "truncated": False}
-            tree = build_descendant_hierarchy(
-                word,
-                mm,
-                lang_code=lang_code,
-                max_depth=max_depth,
-                node_budget=budget,
-            )
-            if not tree.get("children"):
-                tree = _reverse_tree_node(word, lang_code, max_depth=max_depth, node_budget=budget)
-            logger.info("/descendant-tree-from-root built tree for root=%s children=%d", word, len(tree.get("children", [])))
-            payload = {
-                "root": word,
-                "root_lang": lang_code,
-                "tree": tree,
-                "meta": {
-                    "max_depth": max_depth,
-                    "max_nodes": max_nodes,
-                    "truncated": bool(budget.get("truncated")),
-                },
-            }
-            return _add_elapsed_ms(payload, started_at)
+        logger.info("/descendant-tree-from-root request root=%s lang=%s", word, lang_code)
+        tree, truncated = descendant_hierarchy(
+            word,
+            lang_code=lang_code,
+            max_depth=max_depth,
+            max_nodes=max_nodes,
+        )
+        if not tree.get("children"):
+            # No forward children means the hierarchy consumed none of the node budget.
+            budget = {"remaining": max_nodes, "truncated": truncated}
+            tree = _reverse_tree_node(word, lang_code, max_depth=max_depth, node_budget=budget)
+            truncated = bool(budget.get("truncated"))
+        logger.info("/descendant-tree-from-root built tree for root=%s children=%d", word, len(tree.get("children", [])))
+        payload = {
+            "root": word,
+            "root_lang": lang_code,
+            "tree": tree,
+            "meta": {
+                "max_depth": max_depth,
+                "max_nodes": max_nodes,
+                "truncated": truncated,
+            },
+        }
+        return ORJSONResponse(_add_elapsed_ms(payload, started_at))
     except Exception as e:
-        return JSONResponse(content={"error": str(e)}, status_code=500)
-    finally:
-        if mm is not None:
-            mm.close()
+        return ORJSONResponse(content={"error": str(e)}, status_code=500)
 
 
 @router.get("/descendant-paths-from-root")
@@ -599,12 +682,14 @@ async def descendant_paths_from_root(
     max_depth: int = Query(8, ge=1, le=30),
     max_nodes: int = Query(1600, ge=10, le=30000),
     max_paths: int = Query(1000, ge=1, le=20000),
+    stream: bool = Query(False),
 ):
     """Return an array of linear descendant paths (arrays of nodes) starting at provided root.
 
     Each node is a dict with keys: `word`, `lang_code`, `expansion` (when available).
+    With `stream=true` the response is NDJSON instead: a `{"root", "root_lang"}` line,
+    one line per path as it is walked, and a final `{"meta"}` line.
     """
-    mm = None
     started_at = time.perf_counter()
     try:
         cache_key = _cache_key(
@@ -619,104 +704,89 @@ async def descendant_paths_from_root(
         )
         cached = _cache_get(cache_key)
         if cached is not None:
-            return JSONResponse(content=cached)
-
-        with open(JSONL_FILE_PATH, "r", encoding="utf-8") as f:
-            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
-
-            # Attempt to backtrace to furthest ancestor when possible.
-            root_word = word
-            root_lang = None
-
-            # Try to read the original provided word's entry (if any) so we can backtrace from it.
-            orig_key = None
-            if lang_code:
-                candidate = f"{word.lower()}_{lang_code.lower()}"
-                if candidate in index:
-                    orig_key = candidate
-            if not orig_key:
-                orig_key = _find_index_key_for(word)
-
-            entry = None
-            if orig_key:
-                off = _offset_from_index_value(index[orig_key])
-                mm.seek(off)
-                try:
-                    entry = json.loads(mm.readline().decode("utf-8"))
-                except Exception:
-                    entry = None
-
-            # If we have an entry, prefer the deepest etymology template as the ancestor root
-            if entry:
-                templates = entry.get("etymology_templates", []) or []
-                deepest_tpl = None
-                # Walk templates in order and keep the last with an explicit ancestor form (args['3'])
-                for tpl in templates:
-                    if not tpl or not isinstance(tpl, dict):
-                        continue
-                    args = tpl.get("args") or {}
-                    if args.get("3"):
-                        deepest_tpl = tpl
-
-                if deepest_tpl:
-                    args = deepest_tpl.get("args") or {}
-                    cand_word = args.get("3")
-                    cand_lang = args.get("2")
-                    # Prefer transliteration 'tr' if present (helps when ancestor is in non-Latin script)
-                    tr = args.get("tr")
-                    use_word = tr or cand_word
-                    if isinstance(use_word, str) and use_word:
-                        root_word = use_word
-                        root_lang = cand_lang or root_lang
-                else:
-                    # Fallback: try existing helper that follows head_templates
-                    try:
-                        ancestor = find_root_ancestor(entry, mm)
-                        if ancestor:
-                            root_word = ancestor
-                    except Exception:
-                        # keep provided word
-                        root_word = word
-
-            # Build hierarchy starting from discovered root_word
-            logger.info("/descendant-paths-from-root starting root=%s lang=%s", root_word, lang_code)
-            budget = {"remaining": max_nodes, "truncated": False}
-            tree = build_descendant_hierarchy(
-                root_word,
-                mm,
-                lang_code=root_lang or lang_code,
-                max_depth=max_depth,
-                node_budget=budget,
-            )
+            if stream:
+                return StreamingResponse(
+                    _ndjson_paths(cached["root"], cached["root_lang"], cached["paths"], cached["meta"]),
+                    media_type="application/x-ndjson",
+                )
+            return ORJSONResponse(cached)
+
+        # Attempt to backtrace to furthest ancestor when possible.
+        root_word = word
+        root_lang = None
+
+        # Try to read the original provided word's entry (if any) so we can backtrace from it.
+        orig_key = None
+        if lang_code:
+            candidate = index_key(word, lang_code)
+            if candidate in index:
+                orig_key = candidate
+        if not orig_key:
+            orig_key = _find_index_key_for(word)
+
+        use_word, cand_lang, entry = None, None, None
+        if orig_key:
+            off = index[orig_key]
+            try:
+                use_word, cand_lang, entry = _read_etymology_root(off)
+            except Exception:
+                use_word, cand_lang, entry = None, None, None
+
+        # Prefer the deepest etymology template as the ancestor root
+        if use_word:
+            if isinstance(use_word, str):
+                root_word = use_word
+                root_lang = cand_lang or root_lang
+        elif entry:
+            # Fallback: try existing helper that follows head_templates
+            try:
+                ancestor = find_root_ancestor(entry)
+                if ancestor:
+                    root_word = ancestor
+            except Exception:
+                # keep provided word
+                root_word = word
+
+        # Build hierarchy starting from discovered root_word
+        logger.info("/descendant-paths-from-root starting root=%s lang=%s", root_word, lang_code)
+        tree, truncated = descendant_hierarchy(
+            root_word,
+            lang_code=root_lang or lang_code,
+            max_depth=max_depth,
+            max_nodes=max_nodes,
+        )
 
-            # Try to infer a language code for the root (best-effort)
-            k_for_root = _find_index_key_for(root_word)
-            if k_for_root:
-                # key format: '<word>_<langcode>'
-                parts = k_for_root.split("_", 1)
-                if len(parts) > 1:
-                    root_lang = parts[1]
-
-            paths = _flatten_paths_from_tree(tree, root_word=root_word, root_lang=root_lang or lang_code, max_paths=max_paths)
-
-            payload = {
-                "root": root_word,
-                "root_lang": root_lang,
-                "paths": paths,
-                "meta": {
-                    "max_depth": max_depth,
-                    "max_nodes": max_nodes,
-                    "max_paths": max_paths,
-                    "truncated": bool(budget.get("truncated")) or len(paths) >= max_paths,
-                },
-            }
-            _cache_set(cache_key, payload)
-            return JSONResponse(content=_add_elapsed_ms(payload, started_at))
+        # Try to infer a language code for the root (best-effort)
+        k_for_root = _find_index_key_for(root_word)
+        if k_for_root:
+            # key format: '<word>_<langcode>'; the word itself may contain underscores
+            _, sep, key_lang = k_for_root.rpartition("_")
+            if sep:
+                root_lang = key_lang
+
+        if stream:
+            # Paths are generated while the body is sent, so they are not cached.
+            paths = islice(_iter_paths_from_tree(tree, root_word, root_lang or lang_code), max_paths)
+            meta = {"max_depth": max_depth, "max_nodes": max_nodes, "max_paths": max_paths, "truncated": truncated}
+            return StreamingResponse(_ndjson_paths(root_word, root_lang, paths, meta), media_type="application/x-ndjson")
+
+        paths = _flatten_paths_from_tree(tree, root_word=root_word, root_lang=root_lang or lang_code, max_paths=max_paths)
+
+        payload = {
+            "root": root_word,
+            "root_lang": root_lang,
+            "paths": paths,
+            "meta": {
+                "max_depth": max_depth,
+                "max_nodes": max_nodes,
+                "max_paths": max_paths,
+                "truncated": truncated or len(paths) >= max_paths,
+            },
+        }
+        _cache_set(cache_key, payload)
+        return ORJSONResponse(_add_elapsed_ms(payload, started_at))
     except Exception as e:
-        return JSONResponse(content={"error": str(e)}, status_code=500)
-    finally:
-        if mm is not None:
-            mm.close()
+        return ORJSONResponse(content={"error": str(e)}, status_code=500)
 
 
 @router.get("/descendant-preview")
@@ -727,7 +797,6 @@ async def descendant_preview(
     max_nodes: int = Query(500, ge=10, le=5000),
 ):
     """Return a bounded shallow preview tree for overview-first rendering."""
-    mm = None
     started_at = time.perf_counter()
     try:
         cache_key = _cache_key(
@@ -736,36 +805,29 @@ async def descendant_preview(
         )
         cached = _cache_get(cache_key)
         if cached is not None:
-            return cached
-
-        with open(JSONL_FILE_PATH, "r", encoding="utf-8") as f:
-            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
-            budget = {"remaining": max_nodes, "truncated": False}
-            tree = build_descendant_hierarchy(
-                word,
-                mm,
-                lang_code=lang_code,
-                max_depth=depth,
-                node_budget=budget,
-            )
+            return ORJSONResponse(cached)
 
-            payload = {
-                "root": word,
-                "root_lang": lang_code,
-                "tree": tree,
-                "meta": {
-                    "depth": depth,
-                    "max_nodes": max_nodes,
-                    "truncated": bool(budget.get("truncated")),
-                },
-            }
-            _cache_set(cache_key, payload)
-            return _add_elapsed_ms(payload, started_at)
+        tree, truncated = descendant_hierarchy(
+            word,
+            lang_code=lang_code,
+            max_depth=depth,
+            max_nodes=max_nodes,
+        )
+
+        payload = {
+            "root": word,
+            "root_lang": lang_code,
+            "tree": tree,
+            "meta": {
+                "depth": depth,
+                "max_nodes": max_nodes,
+                "truncated": truncated,
+            },
+        }
+        _cache_set(cache_key, payload)
+        return ORJSONResponse(_add_elapsed_ms(payload, started_at))
     except Exception as e:
-        return JSONResponse(content={"error": str(e)}, status_code=500)
-    finally:
-        if mm is not None:
-            mm.close()
+        return ORJSONResponse(content={"error": str(e)}, status_code=500)
 
 
 @router.get("/descendant-count")
@@ -775,7 +837,6 @@ async def descendant_count(
     max_nodes: int = Query(30000, ge=100, le=200000),
 ):
     """Return descendant count with hard cap to avoid unbounded traversal cost."""
-    mm = None
     started_at = time.perf_counter()
     try:
         cache_key = _cache_key(
@@ -784,41 +845,34 @@ async def descendant_count(
         )
         cached = _cache_get(cache_key)
         if cached is not None:
-            return cached
-
-        with open(JSONL_FILE_PATH, "r", encoding="utf-8") as f:
-            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
-            budget = {"remaining": max_nodes, "truncated": False}
-            tree = build_descendant_hierarchy(
-                word,
-                mm,
-                lang_code=lang_code,
-                max_depth=30,
-                node_budget=budget,
-            )
+            return ORJSONResponse(cached)
 
-            def _count_nodes(node):
-                children = node.get("children", []) or []
-                total = len(children)
-                for c in children:
-                    total += _count_nodes(c)
-                return total
-
-            count = _count_nodes(tree)
-            payload = {
-                "root": word,
-                "root_lang": lang_code,
-                "descendant_count": count,
-                "is_capped": bool(budget.get("truncated")),
-                "cap": max_nodes,
-            }
-            _cache_set(cache_key, payload)
-            return _add_elapsed_ms(payload, started_at)
+        tree, truncated = descendant_hierarchy(
+            word,
+            lang_code=lang_code,
+            max_depth=30,
+            max_nodes=max_nodes,
+        )
+
+        def _count_nodes(node):
+            children = node.get("children", []) or []
+            total = len(children)
+            for c in children:
+                total += _count_nodes(c)
+            return total
+
+        count = _count_nodes(tree)
+        payload = {
+            "root": word,
+            "root_lang": lang_code,
+            "descendant_count": count,
+            "is_capped": truncated,
+            "cap": max_nodes,
+        }
+        _cache_set(cache_key, payload)
+        return ORJSONResponse(_add_elapsed_ms(payload, started_at))
     except Exception as e:
-        return JSONResponse(content={"error": str(e)}, status_code=500)
-    finally:
-        if mm is not None:
-            mm.close()
+        return ORJSONResponse(content={"error": str(e)}, status_code=500)
 
 
 @router.get("/descendant-tree-aggregated")
@@ -831,7 +885,6 @@ async def descendant_tree_aggregated(
     aggregate_depth: int = Query(4, ge=1, le=10),
 ):
     """Return a descendant tree with wide branches collapsed into cluster summary nodes."""
-    mm = None
     started_at = time.perf_counter()
     try:
         cache_key = _cache_key(
@@ -847,60 +900,41 @@ async def descendant_tree_aggregated(
         )
         cached = _cache_get(cache_key)
         if cached is not None:
-            return cached
+            return ORJSONResponse(cached)
 
-        with open(JSONL_FILE_PATH, "r", encoding="utf-8") as f:
-            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # Resolve root the same way as the regular descendant-tree endpoint.
+        key = index_key(word, lang_code) if lang_code else _find_index_key_for(word)
+        if not key or key not in index:
+            return ORJSONResponse(content={"error": "Word not found."}, status_code=404)
 
-            # Resolve root the same way as the regular descendant-tree endpoint.
-            key = f"{word.lower()}_{lang_code.lower()}" if lang_code else _find_index_key_for(word)
-            if not key or key not in index:
-                return JSONResponse(content={"error": "Word not found."}, status_code=404)
+        off = index[key]
+        root, _, entry = _read_etymology_root(off)
+        if not root:
+            root = find_root_ancestor(entry)
 
-            off = _offset_from_index_value(index[key])
-            mm.seek(off)
-            entry = json.loads(mm.readline().decode("utf-8"))
+        tree, truncated = descendant_hierarchy(
+            root,
+            lang_code=lang_code,
+            max_depth=max_depth,
+            max_nodes=max_nodes,
+        )
+        aggregated_tree = _aggregate_descendant_tree(tree, branch_limit=branch_limit, max_depth=aggregate_depth)
 
-            root = None
-            templates = entry.get("etymology_templates", []) or []
-            deepest_tpl = None
-            for tpl in templates:
-                if not tpl or not isinstance(tpl, dict):
-                    continue
-                args = tpl.get("args") or {}
-                if args.get("3"):
-                    deepest_tpl = tpl
-
-            if deepest_tpl:
-                args = deepest_tpl.get("args") or {}
-                cand_word = args.get("3")
-                tr = args.get("tr")
-                root = tr or cand_word
-            if not root:
-                root = find_root_ancestor(entry, mm)
-
-            budget = {"remaining": max_nodes, "truncated": False}
-            tree = build_descendant_hierarchy(root, mm, lang_code=lang_code, max_depth=max_depth, node_budget=budget)
-            aggregated_tree = _aggregate_descendant_tree(tree, branch_limit=branch_limit, max_depth=aggregate_depth)
-
-            payload = {
-                "root": root,
-                "tree": aggregated_tree,
-                "meta": {
-                    "max_depth": max_depth,
-                    "max_nodes": max_nodes,
-                    "branch_limit": branch_limit,
-                    "aggregate_depth": aggregate_depth,
-                    "truncated": bool(budget.get("truncated")),
-                },
-            }
-            _cache_set(cache_key, payload)
-            return _add_elapsed_ms(payload, started_at)
+        payload = {
+            "root": root,
+            "tree": aggregated_tree,
+            "meta": {
+                "max_depth": max_depth,
+                "max_nodes": max_nodes,
+                "branch_limit": branch_limit,
+                "aggregate_depth": aggregate_depth,
+                "truncated": truncated,
+            },
+        }
+        _cache_set(cache_key, payload)
+        return ORJSONResponse(_add_elapsed_ms(payload, started_at))
     except Exception as e:
-        return JSONResponse(content={"error": str(e)}, status_code=500)
-    finally:
-        if mm is not None:
-            mm.close()
+        return ORJSONResponse(content={"error": str(e)}, status_code=500)
 
 
 @router.get("/ancestor-roots")
@@ -915,7 +949,6 @@ async def ancestor_roots(
 
     Returns bounded ancestry paths and unique root candidates derived from path ends.
     """
-    mm = None
     try:
         cache_key = _cache_key(
             "ancestor-roots",
@@ -929,40 +962,33 @@ async def ancestor_roots(
         )
         cached = _cache_get(cache_key)
         if cached is not None:
-            return cached
-
-        with open(JSONL_FILE_PATH, "r", encoding="utf-8") as f:
-            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
-
-            roots, all_paths = _resolve_ancestor_roots(
-                mm,
-                word=word,
-                lang_code=lang_code,
-                max_depth=max_depth,
-                max_paths=max_paths,
-                max_branching=max_branching,
-            )
-            if not all_paths:
-                return JSONResponse(content={"error": "Word not found."}, status_code=404)
-
-            payload = {
-                "query": {"word": word, "lang_code": lang_code},
-                "roots": roots,
-                "paths": all_paths,
-                "meta": {
-                    "max_depth": max_depth,
-                    "max_paths": max_paths,
-                    "max_branching": max_branching,
-                    "path_count": len(all_paths),
-                },
-            }
-            _cache_set(cache_key, payload)
-            return payload
+            return ORJSONResponse(cached)
+
+        roots, all_paths = _resolve_ancestor_roots(
+            word=word,
+            lang_code=lang_code,
+            max_depth=max_depth,
+            max_paths=max_paths,
+            max_branching=max_branching,
+        )
+        if not all_paths:
+            return ORJSONResponse(content={"error": "Word not found."}, status_code=404)
+
+        payload = {
+            "query": {"word": word, "lang_code": lang_code},
+            "roots": roots,
+            "paths": all_paths,
+            "meta": {
+                "max_depth": max_depth,
+                "max_paths": max_paths,
+                "max_branching": max_branching,
+                "path_count": len(all_paths),
+            },
+        }
+        _cache_set(cache_key, payload)
+        return ORJSONResponse(payload)
     except Exception as e:
-        return JSONResponse(content={"error": str(e)}, status_code=500)
-    finally:
-        if mm is not None:
-            mm.close()
+        return ORJSONResponse(content={"error": str(e)}, status_code=500)
 
 
 @router.get("/descendant-root")
@@ -974,7 +1000,6 @@ async def descendant_root(
     max_branching: int = Query(5, ge=1, le=20),
 ):
     """Resolve the most likely descendant-root candidate without building descendant paths."""
-    mm = None
     try:
         cache_key = _cache_key(
             "descendant-root",
@@ -988,44 +1013,37 @@ async def descendant_root(
         )
         cached = _cache_get(cache_key)
         if cached is not None:
-            return cached
-
-        with open(JSONL_FILE_PATH, "r", encoding="utf-8") as f:
-            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
-
-            roots, ancestry_paths = _resolve_ancestor_roots(
-                mm,
-                word=word,
-                lang_code=lang_code,
-                max_depth=max_depth,
-                max_paths=max_paths,
-                max_branching=max_branching,
-            )
-            if not roots:
-                return JSONResponse(content={"error": "Word not found."}, status_code=404)
-
-            selected_root = roots[0]
-            payload = {
-                "query": {"word": word, "lang_code": lang_code},
-                "roots": roots,
-                "selected_root": selected_root,
-                "ancestry_paths": ancestry_paths,
-                "root": selected_root.get("word") or word,
-                "root_lang": selected_root.get("lang_code") or lang_code,
-                "meta": {
-                    "max_depth": max_depth,
-                    "max_paths": max_paths,
-                    "max_branching": max_branching,
-                    "path_count": len(ancestry_paths),
-                },
-            }
-            _cache_set(cache_key, payload)
-            return payload
+            return ORJSONResponse(cached)
+
+        roots, ancestry_paths = _resolve_ancestor_roots(
+            word=word,
+            lang_code=lang_code,
+            max_depth=max_depth,
+            max_paths=max_paths,
+            max_branching=max_branching,
+        )
+        if not roots:
+            return ORJSONResponse(content={"error": "Word not found."}, status_code=404)
+
+        selected_root = roots[0]
+        payload = {
+            "query": {"word": word, "lang_code": lang_code},
+            "roots": roots,
+            "selected_root": selected_root,
+            "ancestry_paths": ancestry_paths,
+            "root": selected_root.get("word") or word,
+            "root_lang": selected_root.get("lang_code") or lang_code,
+            "meta": {
+                "max_depth": max_depth,
+                "max_paths": max_paths,
+                "max_branching": max_branching,
+                "path_count": len(ancestry_paths),
+            },
+        }
+        _cache_set(cache_key, payload)
+        return ORJSONResponse(payload)
     except Exception as e:
-        return JSONResponse(content={"error": str(e)}, status_code=500)
-    finally:
-        if mm is not None:
-            mm.close()
+        return ORJSONResponse(content={"error": str(e)}, status_code=500)
 
 
 @router.get("/descendant-paths-resolved")
@@ -1045,7 +1063,6 @@ async def descendant_paths_resolved(
 
     This collapses two frontend calls (ancestor lookup + descendant path fetch) into one.
     """
-    mm = None
     started_at = time.perf_counter()
     try:
         cache_key = _cache_key(
@@ -1065,75 +1082,66 @@ async def descendant_paths_resolved(
         )
         cached = _cache_get(cache_key)
         if cached is not None:
-            return cached
-
-        with open(JSONL_FILE_PATH, "r", encoding="utf-8") as f:
-            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
-
-            roots, ancestry_paths = _resolve_ancestor_roots(
-                mm,
-                word=word,
-                lang_code=lang_code,
-                max_depth=anc_max_depth,
-                max_paths=anc_max_paths,
-                max_branching=anc_max_branching,
-            )
+            return ORJSONResponse(cached)
+
+        roots, ancestry_paths = _resolve_ancestor_roots(
+            word=word,
+            lang_code=lang_code,
+            max_depth=anc_max_depth,
+            max_paths=anc_max_paths,
+            max_branching=anc_max_branching,
+        )
 
-            selected_root = None
-            if preferred_root_word:
-                pref_word_norm = preferred_root_word.strip().lower()
-                pref_lang_norm = preferred_root_lang.strip().lower() if preferred_root_lang else None
-                for r in roots:
-                    rw = (r.get("word") or "").strip().lower()
-                    rl = (r.get("lang_code") or "").strip().lower() if r.get("lang_code") else None
-                    if rw == pref_word_norm and (pref_lang_norm is None or rl == pref_lang_norm):
-                        selected_root = r
-                        break
-
-            if not selected_root:
-                selected_root = roots[0] if roots else {"word": word, "lang_code": lang_code}
-
-            root_word = selected_root.get("word") or word
-            root_lang = selected_root.get("lang_code") or lang_code
-
-            budget = {"remaining": desc_max_nodes, "truncated": False}
-            tree = build_descendant_hierarchy(
-                root_word,
-                mm,
-                lang_code=root_lang,
-                max_depth=desc_max_depth,
-                node_budget=budget,
-            )
-            desc_paths = _flatten_paths_from_tree(tree, root_word=root_word, root_lang=root_lang, max_paths=desc_max_paths)
-
-            payload = {
-                "query": {"word": word, "lang_code": lang_code},
-                "roots": roots,
-                "selected_root": selected_root,
-                "ancestry_paths": ancestry_paths,
-                "paths": desc_paths,
-                "meta": {
-                    "ancestor": {
-                        "max_depth": anc_max_depth,
-                        "max_paths": anc_max_paths,
-                        "max_branching": anc_max_branching,
-                        "path_count": len(ancestry_paths),
-                    },
-                    "descendant": {
-                        "max_depth": desc_max_depth,
-                        "max_nodes": desc_max_nodes,
-                        "max_paths": desc_max_paths,
-                        "truncated": bool(budget.get("truncated")) or len(desc_paths) >= desc_max_paths,
-                    },
+        selected_root = None
+        if preferred_root_word:
+            pref_word_norm = preferred_root_word.strip().lower()
+            pref_lang_norm = preferred_root_lang.strip().lower() if preferred_root_lang else None
+            for r in roots:
+                rw = (r.get("word") or "").strip().lower()
+                rl = (r.get("lang_code") or "").strip().lower() if r.get("lang_code") else None
+                if rw == pref_word_norm and (pref_lang_norm is None or rl == pref_lang_norm):
+                    selected_root = r
+                    break
+
+        if not selected_root:
+            selected_root = roots[0] if roots else {"word": word, "lang_code": lang_code}
+
+        root_word = selected_root.get("word") or word
+        root_lang = selected_root.get("lang_code") or lang_code
+
+        tree, truncated = descendant_hierarchy(
+            root_word,
+            lang_code=root_lang,
+            max_depth=desc_max_depth,
+            max_nodes=desc_max_nodes,
+        )
+        desc_paths = _flatten_paths_from_tree(tree, root_word=root_word, root_lang=root_lang, max_paths=desc_max_paths)
+
+        payload = {
+            "query": {"word": word, "lang_code": lang_code},
+            "roots": roots,
+            "selected_root": selected_root,
+            "ancestry_paths": ancestry_paths,
+            "paths": desc_paths,
+            "meta": {
+                "ancestor": {
+                    "max_depth": anc_max_depth,
+                    "max_paths": anc_max_paths,
+                    "max_branching": anc_max_branching,
+                    "path_count": len(ancestry_paths),
                 },
-            }
-            _cache_set(cache_key, payload)
-            return _add_elapsed_ms(payload, started_at)
+                "descendant": {
+                    "max_depth": desc_max_depth,
+                    "max_nodes": desc_max_nodes,
+                    "max_paths": desc_max_paths,
+                    "truncated": truncated or len(desc_paths) >= desc_max_paths,
+                },
+            },
+        }
+        _cache_set(cache_key, payload)
+        return ORJSONResponse(_add_elapsed_ms(payload, started_at))
     except Exception as e:
-        return JSONResponse(content={"error": str(e)}, status_code=500)
-    finally:
-        if mm is not None:
-            mm.close()
+        return ORJSONResponse(content={"error": str(e)}, status_code=500)
 
 # TODO [HIGH LEVEL]: Progressive disclosure support by level/depth and link strength threshold.
 # TODO [LOW LEVEL]: Add query params `max_depth`, `min_strength` and compute weights from attested links.
@@ -1,13 +1,23 @@
-import os, json, random, mmap
+import random
+import logging
+import asyncio
+import hashlib
+import sqlite3
+import threading
 import unicodedata
-from fastapi import APIRouter, Query, Body
-from fastapi.responses import JSONResponse
-from constants import DATA_DIR, index, JSONL_FILE_PATH, lang_code_to_name
-from dotenv import load_dotenv
+from collections import OrderedDict
+import orjson
+from fastapi import APIRouter, Query, Body, Request
+from fastapi.responses import ORJSONResponse, Response
+from constants import IPA_CACHE_FILE_PATH, index, index_key, word_to_keys, word_to_langs, lang_code_to_name, random_pools, load_entry_by_offset, read_entry_line
 from openai import AsyncOpenAI
 import httpx
 
 router = APIRouter()
+logger = logging.getLogger("word_data_api")
+
+# Entries only change when the data file is replaced; clients revalidate with the ETag after this.
+WORD_DATA_CACHE_CONTROL = "public, max-age=86400"
 
 
 def _normalize_for_match(text: str):
@@ -51,7 +61,7 @@ def _candidate_word_keys(word: str, lang_code: str):
 
     candidates = []
     for normalized_word in _index_word_variants(word):
-        exact = f"{normalized_word}_{normalized_lang}"
+        exact = index_key(normalized_word, normalized_lang)
         if exact in index and exact not in candidates:
             candidates.append(exact)
 
@@ -63,30 +73,51 @@ def _candidate_word_keys(word: str, lang_code: str):
                 if candidate not in candidates:
                     candidates.append(candidate)
 
-        for key in index:
-            if key.startswith(f"{normalized_word}_") and key not in candidates:
+        for key in word_to_keys.get(normalized_word, ()):
+            if key not in candidates:
                 candidates.append(key)
 
     return candidates
 
+
+def _resolve_word_key(word: str, lang_code: str):
+    """Return the first of `_candidate_word_keys` present in `index`, or None.
+
+    Most requests name an indexed word exactly; that key comes from the memoized
+    `index_key`, so the variant and alias candidates are only built on a miss.
+    """
+    exact = index_key(word.strip(), lang_code.strip())
+    if exact in index:
+        return exact
+    return next((candidate for candidate in _candidate_word_keys(word, lang_code) if candidate in index), None)
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Return True if an `If-None-Match` header value names `etag` (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
 @router.get("/word-data")
-async def get_word_data(word: str = Query(...), lang_code: str = Query(...)):
-    key = next((candidate for candidate in _candidate_word_keys(word, lang_code) if candidate in index), None)
+async def get_word_data(request: Request, word: str = Query(...), lang_code: str = Query(...)):
+    key = _resolve_word_key(word, lang_code)
     if key is None:
-        return JSONResponse(content={"message": "No matching entries found."}, status_code=404)
+        return ORJSONResponse(content={"message": "No matching entries found."}, status_code=404)
 
     try:
-        with open(JSONL_FILE_PATH, "r", encoding="utf-8") as f:
-            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
-            mm.seek(index[key])  # Use the integer offset directly
-            line = mm.readline().decode("utf-8").strip()
-            # print(f"[DEBUG] Raw line for word='{word}', lang_code='{lang_code}': {line}")
-            mm.close()
-            data = json.loads(line)
-            return JSONResponse(content=data)
+        # The stored JSONL line already is the response body: send its bytes without a
+        # parse and re-encode round trip.
+        line = read_entry_line(index[key])
     except Exception as e:
-        print(f"[ERROR] get_word_data failed for word='{word}', lang_code='{lang_code}': {e}")
-        return JSONResponse(content={"error": str(e)}, status_code=500)
+        logger.error("get_word_data failed for word=%r lang_code=%r: %s", word, lang_code, e)
+        return ORJSONResponse(content={"error": str(e)}, status_code=500)
+    # Hash the record itself rather than its offset, so a tag changes exactly when the entry does.
+    etag = f'"{hashlib.blake2b(line, digest_size=16).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": WORD_DATA_CACHE_CONTROL}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=line, media_type="application/json", headers=headers)
 
 @router.get("/available-languages")
 async def get_available_languages(word: str = Query(...), codes_only: bool = Query(False)):
@@ -97,35 +128,22 @@ async def get_available_languages(word: str = Query(...), codes_only: bool = Que
       codes_only: backwards compatibility flag; if true returns just list[str]
     """
     word = word.lower()
-    codes = [key.split("_", 1)[1] for key in index if key.startswith(f"{word}_")]
-    if not codes:
-        return JSONResponse(content={"message": "No languages found."}, status_code=404)
-    unique_codes = sorted(set(codes))
+    unique_codes = word_to_langs.get(word)
+    if not unique_codes:
+        return ORJSONResponse(content={"message": "No languages found."}, status_code=404)
     if codes_only:
-        return JSONResponse(content={"languages": unique_codes})
+        return ORJSONResponse({"languages": list(unique_codes)})
     enriched = [
         {"code": c, "name": lang_code_to_name.get(c, c)} for c in unique_codes
     ]
-    return JSONResponse(content={"languages": enriched})
+    return ORJSONResponse({"languages": enriched})
 
 @router.get("/random-interesting-word")
 async def get_random_interest():
-    categories = {
-        "most_translations": os.path.join(DATA_DIR, "most_translations.json"),
-        "most_descendants": os.path.join(DATA_DIR, "most_descendants.json"),
-    }
-    cat = random.choice(list(categories.keys()))
-    file_path = categories[cat]
-
-    if not os.path.exists(file_path):
-        return JSONResponse(content={"error": f"No file for category '{cat}'."}, status_code=500)
-
-    with open(file_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    if not data:
-        return JSONResponse(content={"error": f"No entries found in {file_path}."}, status_code=404)
-
-    return {"category": cat, "entry": random.choice(data)}
+    if not random_pools:
+        return ORJSONResponse(content={"error": "No interesting-word lists are loaded."}, status_code=500)
+    cat = random.choice(list(random_pools))
+    return ORJSONResponse({"category": cat, "entry": random.choice(random_pools[cat])})
 
 # TODO [HIGH LEVEL]: Add POST /ai/suggest-filters to propose filters and patterns for exploration.
 # TODO [LOW LEVEL]: Accept seed word/lang and return filters with rationale and example matches.
@@ -135,18 +153,14 @@ async def get_random_interest():
 
 # Helper: Get word-data or supplement with AI if missing
 async def get_word_data_or_ai(word, lang_code):
-    key = next((candidate for candidate in _candidate_word_keys(word, lang_code) if candidate in index), None)
+    key = _resolve_word_key(word, lang_code)
     if key:
-        with open(JSONL_FILE_PATH, "r", encoding="utf-8") as f:
-            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
-            mm.seek(index[key])
-            line = mm.readline().decode("utf-8").strip()
-            mm.close()
-            data = json.loads(line)
-            # # If IPA missing, try to supplement
-            # if not data.get("sounds") or not any(s.get("ipa") for s in data.get("sounds", [])):
-            #     data["ai_estimated_ipa"] = await ai_estimate_ipa(word, lang_code)
-            return data
+        # Copy: cached entries are shared and build_ancestry_chain annotates the node.
+        data = dict(load_entry_by_offset(index[key]))
+        # # If IPA missing, try to supplement
+        # if not data.get("sounds") or not any(s.get("ipa") for s in data.get("sounds", [])):
+        #     data["ai_estimated_ipa"] = await ai_estimate_ipa(word, lang_code)
+        return data
     # Not found, supplement with AI
     return {
         "word": word,
@@ -156,146 +170,289 @@ async def get_word_data_or_ai(word, lang_code):
     }
 
 # Helper: AI estimation for IPA using latest OpenAI async API
+IPA_MODEL = "gpt-4.1-nano"
+_IPA_SYSTEM_PROMPT = "You are a historical linguist. Reply with only the most plausible IPA transcription in square brackets, guessing from sound changes if unknown."
+_IPA_BATCH_SYSTEM_PROMPT = "You are a historical linguist. Reply with only a JSON object mapping each item number to its most plausible IPA transcription in square brackets, guessing from sound changes if unknown."
+_IPA_PROMPT_CONTEXT = "IPA for the historical word in: {}".format
+_IPA_PROMPT_WORD = "IPA for the historical word {!r} ({})".format
+_OPENAI = None
+# Most recently used IPA estimates kept in memory in front of the SQLite cache.
+IPA_MEMORY_CACHE_SIZE = 4096
+_ipa_estimate_cache = OrderedDict()
+_ipa_cache_db = None
+# SQLite calls run in worker threads; one connection is shared, so serialize its use.
+_ipa_cache_lock = threading.Lock()
+# Upper bound on OpenAI requests in flight across all concurrent chains.
+_OPENAI_CONCURRENCY = asyncio.Semaphore(8)
+
+
+def _get_openai():
+    """Return the shared AsyncOpenAI client, created on first use (needs OPENAI_API_KEY)."""
+    global _OPENAI
+    if _OPENAI is None:
+        _OPENAI = AsyncOpenAI()
+    return _OPENAI
+
+
+async def close_openai_client() -> None:
+    """Close the shared OpenAI client, if one was created (called on app shutdown)."""
+    global _OPENAI
+    if _OPENAI is not None:
+        await _OPENAI.close()
+        _OPENAI = None
+
+
+def _get_ipa_cache_db():
+    """Return the on-disk IPA estimate cache, creating the SQLite table on first use."""
+    global _ipa_cache_db
+    if _ipa_cache_db is None:
+        _ipa_cache_db = sqlite3.connect(IPA_CACHE_FILE_PATH, check_same_thread=False)
+        _ipa_cache_db.execute("CREATE TABLE IF NOT EXISTS ipa_cache (key TEXT PRIMARY KEY, ipa TEXT NOT NULL)")
+    return _ipa_cache_db
+
+
+def close_ipa_cache() -> None:
+    """Close the on-disk IPA estimate cache (called on app shutdown)."""
+    global _ipa_cache_db
+    with _ipa_cache_lock:
+        if _ipa_cache_db is not None:
+            _ipa_cache_db.close()
+            _ipa_cache_db = None
+
+
+def _ipa_cache_digest(item):
+    word, lang_code, expansion = item
+    return hashlib.blake2b(f"{word}|{lang_code}|{expansion or ''}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _remember_ipa_estimate(item, ipa):
+    _ipa_estimate_cache[item] = ipa
+    _ipa_estimate_cache.move_to_end(item)
+    if len(_ipa_estimate_cache) > IPA_MEMORY_CACHE_SIZE:
+        _ipa_estimate_cache.popitem(last=False)
+
+
+def _read_ipa_rows(digests):
+    """Return `{digest: ipa}` for the digests present in the SQLite cache (runs in a thread)."""
+    try:
+        with _ipa_cache_lock:
+            rows = _get_ipa_cache_db().execute(
+                f"SELECT key, ipa FROM ipa_cache WHERE key IN ({','.join('?' * len(digests))})", digests
+            ).fetchall()
+    except sqlite3.Error as e:
+        logger.warning("IPA cache lookup failed: %s", e)
+        return {}
+    return dict(rows)
+
+
+def _write_ipa_rows(rows):
+    """Insert `(digest, ipa)` rows into the SQLite cache with a single commit (runs in a thread)."""
+    try:
+        with _ipa_cache_lock:
+            db = _get_ipa_cache_db()
+            db.executemany("INSERT OR REPLACE INTO ipa_cache (key, ipa) VALUES (?, ?)", rows)
+            db.commit()
+    except sqlite3.Error as e:
+        logger.warning("IPA cache write failed: %s", e)
+
+
+async def _cached_ipa_estimates(items):
+    """Return previous estimates for `(word, lang_code, expansion)` items from memory or disk.
+
+    The result is aligned with `items`, with None where nothing is cached. Items missing
+    from memory are looked up on disk in one query, off the event loop.
+    """
+    results = []
+    for item in items:
+        ipa = _ipa_estimate_cache.get(item)
+        if ipa is not None:
+            _ipa_estimate_cache.move_to_end(item)
+        results.append(ipa)
+    missing = {_ipa_cache_digest(item): item for item, r in zip(items, results) if r is None}
+    if not missing:
+        return results
+    rows = await asyncio.to_thread(_read_ipa_rows, list(missing))
+    for digest, ipa in rows.items():
+        _remember_ipa_estimate(missing[digest], ipa)
+    return [rows.get(_ipa_cache_digest(item)) if r is None else r for item, r in zip(items, results)]
+
+
+async def _store_ipa_estimates(estimates):
+    """Remember `{item: ipa}` in memory and write them to disk in one transaction."""
+    for item, ipa in estimates.items():
+        _remember_ipa_estimate(item, ipa)
+    await asyncio.to_thread(_write_ipa_rows, [(_ipa_cache_digest(item), ipa) for item, ipa in estimates.items()])
+
+
 async def ai_estimate_ipa(word, lang_code, expansion=None):
-    load_dotenv()
-    client = AsyncOpenAI()
-
-    if expansion:
-        prompt = (
-            f"Estimate the IPA pronunciation of the historical word in this etymological context: {expansion}. "
-            "Respond only with the phonetic IPA transcription in square brackets, without additional explanation or text. "
-            "If the pronunciation is unknown, make your best linguistic guess based on phonological reasoning and related forms."
-        )
-    else:
-        prompt = (
-            f"Estimate the IPA pronunciation of the historical word '{word}' in the language '{lang_code}'. "
-            "Respond only with the IPA transcription in square brackets, without additional explanation or text. "
-            "If the pronunciation is unknown, make your best linguistic guess based on phonological reasoning and related forms."
-        )
+    cache_key = (word, lang_code, expansion)
+    cached = (await _cached_ipa_estimates([cache_key]))[0]
+    if cached is not None:
+        return cached
+
+    prompt = _IPA_PROMPT_CONTEXT(expansion) if expansion else _IPA_PROMPT_WORD(word, lang_code)
 
     # print(f"[DEBUG] AI estimation prompt: {prompt}")
 
     try:
-        completion = await client.chat.completions.create(
-            model="gpt-4.1-nano",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a historical linguist and expert in phonological reconstruction and IPA transcription. You estimate historical pronunciations using comparative linguistics, etymology, and knowledge of sound changes. Only respond with the most plausible IPA transcription in square brackets. No extra text."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            max_tokens=20
-        )
+        async with _OPENAI_CONCURRENCY:
+            completion = await _get_openai().chat.completions.create(
+                model=IPA_MODEL,
+                messages=[
+                    {"role": "system", "content": _IPA_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt},
+                ],
+                max_tokens=20,
+                temperature=0,
+            )
         result = completion.choices[0].message.content.strip()
         # TODO [LOW LEVEL]: Normalize brackets to phonemic/phonetic form and validate with ft parser.
+        await _store_ipa_estimates({cache_key: result})
         return result
     except Exception as e:
         return None
 
+# Helper: AI estimation for several words in one round-trip
+async def ai_estimate_ipa_batch(items):
+    """Estimate IPA for a list of (word, lang_code, expansion) tuples with a single LLM call.
+
+    Returns a list aligned with `items`; entries are None where no estimate came back.
+    """
+    results = await _cached_ipa_estimates(items)
+    # A chain can name the same ancestor twice; ask for each distinct item once.
+    pending = list(dict.fromkeys(item for item, r in zip(items, results) if r is None))
+    if not pending:
+        return results
+    if len(pending) == 1:
+        estimate = await ai_estimate_ipa(*pending[0])
+        return [estimate if r is None else r for r in results]
+
+    lines = []
+    for n, (word, lang_code, expansion) in enumerate(pending, 1):
+        prompt = _IPA_PROMPT_CONTEXT(expansion) if expansion else _IPA_PROMPT_WORD(word, lang_code)
+        lines.append(f"{n}. {prompt}")
+    prompt = "\n".join(lines)
+
+    try:
+        async with _OPENAI_CONCURRENCY:
+            completion = await _get_openai().chat.completions.create(
+                model=IPA_MODEL,
+                messages=[
+                    {"role": "system", "content": _IPA_BATCH_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt},
+                ],
+                response_format={"type": "json_object"},
+                max_tokens=20 * len(pending) + 20,
+                temperature=0,
+            )
+        estimates = orjson.loads(completion.choices[0].message.content)
+    except Exception as e:
+        return results
+
+    found = {}
+    for n, item in enumerate(pending, 1):
+        estimate = estimates.get(str(n)) if isinstance(estimates, dict) else None
+        if isinstance(estimate, str) and estimate.strip():
+            found[item] = estimate.strip()
+    if found:
+        await _store_ipa_estimates(found)
+    return [found.get(item) if r is None else r for item, r in zip(items, results)]
+
+# Shared HTTP client so internal calls reuse pooled keep-alive connections
+_HTTPX = httpx.AsyncClient(
+    base_url="http://localhost:8000",
+    timeout=5.0,
+    limits=httpx.Limits(max_keepalive_connections=32),
+)
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client (called on app shutdown)."""
+    await _HTTPX.aclose()
+
+
 # Helper: Get phonetic drift (call existing endpoint internally)
 async def get_phonetic_drift(ipa1, ipa2):
-    url = "http://localhost:8000/phonetic-drift-detailed"
     params = {"ipa1": ipa1, "ipa2": ipa2}
-    async with httpx.AsyncClient() as client:
-        try:
-            r = await client.get(url, params=params)
-            if r.status_code == 200:
-                return r.json()
-        except Exception:
-            pass
+    try:
+        r = await _HTTPX.get("/phonetic-drift-detailed", params=params)
+        if r.status_code == 200:
+            return r.json()
+    except Exception:
+        pass
     return None
 
 
+# Helper: Pick the phonetic and phonemic IPA out of an entry's sounds
+def _ipa_from_sounds(node):
+    """Return (ipa, phonemic_ipa): the first [phonetic] form and the last /phonemic/ form."""
+    ipa = None
+    phonemic_ipa = None
+    for s in node.get("sounds") or ():
+        ipa_candidate = s.get("ipa")
+        if not ipa_candidate:
+            continue
+        if ipa_candidate.startswith("/") and ipa_candidate.endswith("/"):
+            phonemic_ipa = ipa_candidate
+        elif not ipa:
+            ipa = ipa_candidate
+    return ipa, phonemic_ipa
+
+
 # Flat ancestry chain builder for timeline
 async def build_ancestry_chain(word, lang_code, max_depth=10):
-    chain = []
     # Get root node
     node = await get_word_data_or_ai(word, lang_code)
-    ipa = None
-    phonemic_ipa = None
     # print(f"[DEBUG] build_ancestry_chain: word={word}, lang_code={lang_code}, node.sounds={node.get('sounds')}")
-    # Prefer real IPA and phonemic IPA from sounds
-    if node.get("sounds"):
-        for s in node["sounds"]:
-            if s.get("ipa"):
-                ipa_candidate = s["ipa"]
-                # print(f"[DEBUG] IPA candidate for root: {ipa_candidate}")
-                if ipa_candidate.startswith("/") and ipa_candidate.endswith("/"):
-                    phonemic_ipa = ipa_candidate
-                elif not ipa:
-                    ipa = ipa_candidate
-    # Only estimate IPA if no real IPA found
-    if not ipa:
-        expansion = node.get("expansion")
-        # print(f"[DEBUG] No real IPA for root, estimating with AI for word={word}, lang_code={lang_code}, expansion={expansion}")
-        ipa = await ai_estimate_ipa(word, lang_code, expansion)
-        node["ai_estimated_ipa"] = ipa
-    else:
-        # print(f"[DEBUG] Real IPA found for root: {ipa}")
-        # Remove ai_estimated_ipa if real IPA exists
-        node.pop("ai_estimated_ipa", None)
-    # (Removed duplicate root node logic that overwrote real IPA)
-    chain.append({
-        "word": word,
-        "lang_code": lang_code,
-        "ipa": ipa,
-        "phonemic_ipa": phonemic_ipa,
-        "node": node,
-        "drift": 0  # root node has no drift
-    })
-    # Walk through all etymology_templates in order
+    # Walk through all etymology_templates in order. Ancestor lookups are independent
+    # of each other, so issue them concurrently.
     templates = node.get("etymology_templates", [])
-    prev_ipa = ipa
+    pairs = []
     for tpl in templates:
         lang = tpl["args"].get("2")
         w = tpl["args"].get("3")
-        # print(f"[DEBUG] Template: lang={lang}, word={w}")
         if lang and w:
-            # Get ancestor node
-            ancestor = await get_word_data_or_ai(w, lang)
-            # print(f"[DEBUG] Ancestor node for word={w}, lang={lang}: sounds={ancestor.get('sounds')}")
-            ancestor_ipa = None
-            ancestor_phonemic_ipa = None
-            # Prefer real IPA and phonemic IPA from sounds
-            if ancestor.get("sounds"):
-                for s in ancestor["sounds"]:
-                    if s.get("ipa"):
-                        ipa_candidate = s["ipa"]
-                        # print(f"[DEBUG] IPA candidate for ancestor {w}: {ipa_candidate}")
-                        if ipa_candidate.startswith("/") and ipa_candidate.endswith("/"):
-                            ancestor_phonemic_ipa = ipa_candidate
-                        elif not ancestor_ipa:
-                            ancestor_ipa = ipa_candidate
-            # Only estimate IPA if no real IPA found
-            if not ancestor_ipa:
-                expansion = ancestor.get("expansion")
-                # print(f"[DEBUG] No real IPA for ancestor {w}, estimating with AI, expansion={expansion}")
-                ancestor_ipa = await ai_estimate_ipa(w, lang, expansion)
-                ancestor["ai_estimated_ipa"] = ancestor_ipa
-            else:
-                # print(f"[DEBUG] Real IPA found for ancestor {w}: {ancestor_ipa}")
-                # Remove ai_estimated_ipa if real IPA exists
-                ancestor.pop("ai_estimated_ipa", None)
-            # Compute drift score
-            drift_score = 0
-            if prev_ipa and ancestor_ipa:
-                try:
-                    drift_score = dst.feature_edit_distance(str(prev_ipa), str(ancestor_ipa))
-                except Exception as e:
-                    # print(f"[DEBUG] Drift score computation failed for {w}: {e}")
-                    drift_score = 0
-            # print(f"[DEBUG] Chain append: word={w}, lang={lang}, ipa={ancestor_ipa}, phonemic_ipa={ancestor_phonemic_ipa}, drift={drift_score}")
-            chain.append({
-                "word": w,
-                "lang_code": lang,
-                "ipa": ancestor_ipa,
-                "phonemic_ipa": ancestor_phonemic_ipa,
-                "node": ancestor,
-                "drift": drift_score
-            })
-            prev_ipa = ancestor_ipa
+            pairs.append((w, lang))
+    # Templates often name the same ancestor more than once (or repeat the root word);
+    # each distinct pair is looked up once and later repeats get their own copy.
+    fetched = {(word, lang_code): node}
+    distinct = [pair for pair in dict.fromkeys(pairs) if pair not in fetched]
+    async with asyncio.TaskGroup() as tg:
+        tasks = [tg.create_task(get_word_data_or_ai(w, lang)) for w, lang in distinct]
+    fetched.update(zip(distinct, (task.result() for task in tasks)))
+    ancestors = [dict(fetched[pair]) for pair in pairs]
+
+    # The root is resolved like any ancestor so its IPA estimate rides in the same batch.
+    resolved = []
+    missing_ipa = []
+    for (w, lang), entry in zip([(word, lang_code)] + pairs, [node] + ancestors):
+        # Prefer real IPA and phonemic IPA from sounds
+        entry_ipa, entry_phonemic_ipa = _ipa_from_sounds(entry)
+        if entry_ipa:
+            # Remove ai_estimated_ipa if real IPA exists
+            entry.pop("ai_estimated_ipa", None)
+        else:
+            missing_ipa.append(len(resolved))
+        resolved.append([w, lang, entry, entry_ipa, entry_phonemic_ipa])
+
+    # Only estimate IPA if no real IPA found; every missing entry shares one LLM call
+    estimates = await ai_estimate_ipa_batch(
+        [(resolved[i][0], resolved[i][1], resolved[i][2].get("expansion")) for i in missing_ipa]
+    )
+    for i, estimated_ipa in zip(missing_ipa, estimates):
+        resolved[i][3] = estimated_ipa
+        resolved[i][2]["ai_estimated_ipa"] = estimated_ipa
+
+    chain = []
+    for w, lang, entry, entry_ipa, entry_phonemic_ipa in resolved:
+        chain.append({
+            "word": w,
+            "lang_code": lang,
+            "ipa": entry_ipa,
+            "phonemic_ipa": entry_phonemic_ipa,
+            "node": entry,
+            # No feature-distance scorer is available in this backend; the field is kept
+            # so timeline clients see the same shape.
+            "drift": 0
+        })
     return chain
\ No newline at end of file
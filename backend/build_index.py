@@ -13,9 +13,18 @@
     # most_spellings = ...
     # most_syllables_one_character = ...
 
-import json
+import os
+import sys
 import heapq
-from collections import defaultdict
+import multiprocessing
+from array import array
+import orjson
+from collections import defaultdict, deque
+from constants import jsonl_fingerprint, write_packed_index
+try:
+    import simdjson
+except ImportError:  # pragma: no cover - optional accelerator
+    simdjson = None
 try:
     from tqdm import tqdm
 except Exception:
@@ -35,10 +44,14 @@ except Exception:
 # File paths
 JSONL_FILE_PATH = "data/wiktionary_data.jsonl"
 INDEX_OUTPUT_PATH = "data/wiktionary_index.json"
+INDEX_KEYS_OUTPUT_PATH = "data/wiktionary_index.keys"
+INDEX_OFFSETS_OUTPUT_PATH = "data/wiktionary_index.offsets"
 MOST_TRANSLATIONS_OUTPUT_PATH = "data/most_translations.json"
 MOST_DESCENDANTS_OUTPUT_PATH = "data/most_descendants.json"
 LONGEST_ETYMOLOGICAL_CHAINS_OUTPUT_PATH = "data/longest_etymological_chains.json"
 REVERSE_DESCENDANT_GRAPH_OUTPUT_PATH = "data/reverse_descendant_graph.json"
+LANG_MAP_OUTPUT_PATH = "data/language_codes.json"
+INDEX_MANIFEST_OUTPUT_PATH = "data/index_manifest.json"
 
 # Languages to exclude from longest word category (sign languages, gloss systems)
 SIGN_LANG_CODES = {
@@ -65,8 +78,37 @@ def compute_descendant_counts(descendant_links: dict) -> dict:
     This counter feeds the offline, non-critical "most descendants" stat; a cyclic
     etymology dump must never be able to crash the index build (and thus FastAPI
     startup) again.
+
+    Most of the graph is acyclic, so it is first counted leaves-up in a single
+    Kahn-style sweep: a node is finalized once all of its children are. The sweep
+    runs over integer node ids and plain lists, so it never hashes a key. Only nodes
+    left over (on a cycle or upstream of one) go through the DFS below, which sees
+    the swept nodes as already counted.
     """
-    counts: dict = {}  # node -> finished descendant count (memo)
+    ids = {node: i for i, node in enumerate(descendant_links)}
+    child_ids = [[ids.setdefault(child, len(ids)) for child in children] for children in descendant_links.values()]
+    child_ids.extend([] for _ in range(len(ids) - len(child_ids)))  # leaf-only nodes
+    parents = [[] for _ in ids]
+    pending = [len(children) for children in child_ids]  # node -> children not yet counted
+    for i, children in enumerate(child_ids):
+        for child in children:
+            parents[child].append(i)
+    totals = [0] * len(ids)
+    ready = deque(i for i, n in enumerate(pending) if n == 0)
+    while ready:
+        i = ready.popleft()
+        total = 0
+        for child in child_ids[i]:
+            total += totals[child] + 1
+        totals[i] = total
+        for parent in parents[i]:
+            pending[parent] -= 1
+            if pending[parent] == 0:
+                ready.append(parent)
+
+    # node -> finished descendant count (memo)
+    counts: dict = {node: totals[i] for node, i in ids.items() if pending[i] == 0}
+
     for start in sorted(descendant_links.keys()):
         if start in counts:
             continue
@@ -101,85 +143,177 @@ def compute_descendant_counts(descendant_links: dict) -> dict:
 # `etymology_templates` in each entry. We compute that directly while
 # indexing instead of performing graph traversal here.
 
-def build_index_from_jsonl(jsonl_file_path: str, index_output_path: str) -> None:
+TOP_N = 100
+
+# The JSONL scan is split into line-aligned byte ranges parsed by separate
+# processes. Files smaller than one shard per worker use fewer shards, so small
+# dumps (and tests) are scanned in-process.
+INDEX_WORKERS = os.cpu_count() or 1
+MIN_SHARD_BYTES = 64 * 1024 * 1024
+# Records counted between progress bar refreshes; a per-line update() costs more than
+# parsing short records.
+PROGRESS_BATCH = 10_000
+# Parsed input is released from the page cache in steps of this many bytes.
+FADVISE_DROP_BYTES = 64 * 1024 * 1024
+# Encoded output is collected up to this size before each write() call.
+WRITE_CHUNK_BYTES = 64 * 1024
+
+
+def shard_offsets(path: str, shards: int) -> list:
+    """Split ``path`` into at most ``shards`` contiguous ``(start, end)`` byte ranges.
+
+    Each cut is moved forward to just past the next newline, so every line falls in
+    exactly one range and ranges cover the file in order.
     """
-    Builds a byte-offset index for fast lookup and precomputes Hall of Fame data:
-    - Most translations
-    - Most descendants (via reverse descendant links)
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, "rb") as f:
+        for i in range(1, max(1, shards)):
+            f.seek(i * size // shards)
+            f.readline()
+            cut = f.tell()
+            if bounds[-1] < cut < size:
+                bounds.append(cut)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def scan_range(path: str, start: int, end: int, shard: int = 0) -> dict:
+    """Index the JSONL records that start in ``[start, end)``.
+
+    Offsets are absolute file positions, so results from consecutive ranges can be
+    merged directly (see ``build_index_from_jsonl``). Heaps hold at most ``TOP_N``
+    items, which is enough for the merged top ``TOP_N``.
     """
-
-    word_lang_index = dict()
+    # First offset per key, in file order: keys in a list, offsets in a flat int64
+    # array. `all_entry_keys` doubles as the "already indexed" set.
+    index_keys = []
+    index_offsets = array("q")
     record_count = 0
-
-    TOP_N = 100
     longest_chains_heap = []
     most_translations_heap = []
 
     # Optimized memory: store only keys, not full entries
     all_entry_keys = set()
 
+    # lang_code -> human-readable language name, from the first record that has one.
+    lang_names = {}
+
     # Local descendant graph used only for the offline "most descendants" stat.
+    # Keys are ``(word, lang_code)`` tuples; the bare-word node is the 1-tuple ``(word,)``
+    # so it stays distinct from a child whose descendant text named no language.
     descendant_links = defaultdict(set)
 
-    def add_descendant_link(parent_word: str, parent_lang: str, child_key: str) -> None:
+    def add_descendant_link(parent_word: str, parent_lang: str, child_key: tuple) -> None:
         parent_word = (parent_word or "").strip().lower()
         parent_lang = (parent_lang or "").strip().lower()
         if not parent_word or not child_key:
             return
 
-        exact_key = f"{parent_word}_{parent_lang}" if parent_lang else None
-        if exact_key:
-            descendant_links[exact_key].add(child_key)
-        descendant_links[parent_word].add(child_key)
-
-    with open(jsonl_file_path, "r", encoding="utf-8") as jsonl_file:
-        with tqdm(desc="Indexing records", unit=" lines") as progress_bar:
+        if parent_lang:
+            descendant_links[(parent_word, sys.intern(parent_lang))].add(child_key)
+        descendant_links[(parent_word,)].add(child_key)
+
+    # Binary mode: tell() is a plain position lookup (text-mode tell() re-encodes
+    # decoder state), and orjson parses the raw bytes without a decode/strip copy.
+    with open(path, "rb") as jsonl_file:
+        jsonl_file.seek(start)
+        # Bind per-record callables to locals once; the loop runs once per JSONL line.
+        tell = jsonl_file.tell
+        readline = jsonl_file.readline
+        loads = orjson.loads
+        intern = sys.intern
+        heappush = heapq.heappush
+        heappushpop = heapq.heappushpop
+        add_entry_key = all_entry_keys.add
+        add_index_key = index_keys.append
+        add_index_offset = index_offsets.append
+        top_n = TOP_N
+        no_fields = {}.get
+        # Records without translations, descendants or etymology templates only add their
+        # (word, lang_code) key. For those, pysimdjson reads just the two strings instead of
+        # building the whole record as Python objects. A key name showing up inside some
+        # value only costs the full parse.
+        key_parser = simdjson.Parser() if simdjson is not None else None
+        # The range is read once, front to back: ask for aggressive readahead and drop
+        # pages already parsed so a multi-GB scan doesn't evict the rest of the page cache.
+        fadvise = getattr(os, "posix_fadvise", None)
+        if fadvise is not None:
+            fadvise(jsonl_file.fileno(), start, end - start, os.POSIX_FADV_SEQUENTIAL)
+        dropped_to = start
+        with tqdm(desc=f"Indexing shard {shard}", unit=" lines", position=shard) as progress_bar:
             while True:
-                byte_offset = jsonl_file.tell()
-                line = jsonl_file.readline()
+                byte_offset = tell()
+                if byte_offset >= end:
+                    break
+                line = readline()
                 if not line:
                     break
 
                 try:
-                    entry = json.loads(line.strip())
-                    word = entry.get("word", "").lower()
-                    lang_code = entry.get("lang_code", "").lower()
+                    doc = None
+                    if key_parser is not None and not (
+                        b'"translations"' in line or b'"descendants"' in line or b'"etymology_templates"' in line
+                    ):
+                        doc = key_parser.parse(line)
+                        get = doc.get
+                    else:
+                        get = loads(line).get
+                    word = get("word", "").lower()
+                    # Only a few thousand distinct codes exist; share one string object per code.
+                    lang_code = intern(get("lang_code", "").lower())
+                    if lang_code not in lang_names:
+                        lang_name = get("lang")
+                        if lang_name:
+                            lang_names[lang_code] = lang_name
+                    if doc is not None:
+                        # The parser can only be reused once the document is released.
+                        doc = None
+                        get = no_fields
 
                     if word and lang_code:
-                        index_key = f"{word}_{lang_code}"
-                        if index_key not in word_lang_index:
-                            word_lang_index[index_key] = byte_offset
-                        all_entry_keys.add(index_key)
-
-                        pos = entry.get("pos", "").lower()
+                        # Tuple keys are formatted as "<word>_<lang_code>" only once, when merged.
+                        index_key = (word, lang_code)
+                        if index_key not in all_entry_keys:
+                            add_entry_key(index_key)
+                            add_index_key(index_key)
+                            add_index_offset(byte_offset)
 
                         # ✅ Most translations
-                        translations = entry.get("translations", [])
+                        translations = get("translations", [])
                         num_translations = len(translations)
                         if num_translations > 0:
-                            heapq.heappush(most_translations_heap, (num_translations, word, lang_code))
-                            if len(most_translations_heap) > TOP_N:
-                                heapq.heappop(most_translations_heap)
+                            # Once a heap is full, only records that can tie or beat its minimum
+                            # build a tuple; heappushpop keeps tie-breaking on (word, lang_code).
+                            if len(most_translations_heap) < top_n:
+                                heappush(most_translations_heap, (num_translations, word, lang_code))
+                            elif num_translations >= most_translations_heap[0][0]:
+                                heappushpop(most_translations_heap, (num_translations, word, lang_code))
 
                         # ✅ Local descendant graph for offline descendant-count stats
-                        descendants = entry.get("descendants", [])
+                        descendants = get("descendants", [])
                         for desc in descendants:
                             text = desc.get("text", "")
-                            if ":" in text:
-                                lang_part, word_part = text.split(":", 1)
-                                lang = lang_part.strip().lower()
-                                child_word = word_part.strip().split(" ", 1)[0]
+                            colon = text.find(":")
+                            if colon != -1:
+                                # "<lang>: <word> ..." -> the first space-separated token after the colon.
+                                lang = text[:colon].strip().lower()
+                                child_word = text[colon + 1:].strip()
+                                space = child_word.find(" ")
+                                if space != -1:
+                                    child_word = child_word[:space]
                                 if child_word:
-                                    child_key = f"{child_word.lower()}_{lang}"
+                                    child_key = (child_word.lower(), intern(lang))
                                     add_descendant_link(word, lang_code, child_key)
 
                         # Etymology templates: record length for longest-chain stat
-                        etym_templates = entry.get("etymology_templates", []) or []
+                        etym_templates = get("etymology_templates", []) or []
                         etym_len = len(etym_templates)
                         if etym_len > 0:
-                            heapq.heappush(longest_chains_heap, (etym_len, word, lang_code))
-                            if len(longest_chains_heap) > TOP_N:
-                                heapq.heappop(longest_chains_heap)
+                            if len(longest_chains_heap) < top_n:
+                                heappush(longest_chains_heap, (etym_len, word, lang_code))
+                            elif etym_len >= longest_chains_heap[0][0]:
+                                heappushpop(longest_chains_heap, (etym_len, word, lang_code))
 
                         for tpl in etym_templates:
                             if not tpl or not isinstance(tpl, dict):
@@ -195,13 +329,98 @@ def build_index_from_jsonl(jsonl_file_path: str, index_output_path: str) -> None
                             # (no parent_links collection needed for template-count metric)
 
                     record_count += 1
-                    progress_bar.update(1)
-
-                except json.JSONDecodeError:
+                    if not record_count % PROGRESS_BATCH:
+                        progress_bar.update(PROGRESS_BATCH)
+                        if fadvise is not None and byte_offset - dropped_to >= FADVISE_DROP_BYTES:
+                            fadvise(jsonl_file.fileno(), dropped_to, byte_offset - dropped_to, os.POSIX_FADV_DONTNEED)
+                            dropped_to = byte_offset
+
+                except (ValueError, RuntimeError):
+                    # Parse failures (orjson.JSONDecodeError is a ValueError; pysimdjson
+                    # raises ValueError or RuntimeError): skip the line.
                     continue
+            progress_bar.update(record_count % PROGRESS_BATCH)
+
+    return {
+        "keys": index_keys,
+        "offsets": index_offsets,
+        "record_count": record_count,
+        "longest_chains": longest_chains_heap,
+        "most_translations": most_translations_heap,
+        "lang_names": lang_names,
+        "descendant_links": descendant_links,
+    }
+
+
+def _graph_key(key: tuple) -> str:
+    """Format a ``(word, lang_code)`` or bare ``(word,)`` graph node as its ``reverse_descendant_graph.json`` key."""
+    return "_".join(key)
+
 
-    # Save index
-    save_index_to_json(word_lang_index, index_output_path)
+def _reverse_descendant_graph(descendant_links: dict) -> dict:
+    """Format ``descendant_links`` as the ``{parent: sorted children}`` JSON graph.
+
+    Distinct tuple nodes can format to the same string (the bare ``("a_b",)`` and the
+    pair ``("a", "b")`` are both ``"a_b"``); their children are merged, as the
+    string-keyed graph did.
+    """
+    graph = {}
+    for key, children in descendant_links.items():
+        graph.setdefault(_graph_key(key), set()).update(map(_graph_key, children))
+    return {key: sorted(children) for key, children in graph.items()}
+
+
+def _scan_shard(args):
+    return scan_range(*args)
+
+
+def build_index_from_jsonl(jsonl_file_path: str, index_output_path: str, workers: int = INDEX_WORKERS) -> None:
+    """
+    Builds a byte-offset index for fast lookup and precomputes Hall of Fame data:
+    - Most translations
+    - Most descendants (via reverse descendant links)
+
+    The file is scanned in up to ``workers`` line-aligned shards in parallel; shard
+    results are merged in file order, so the output matches a single sequential scan.
+    """
+    shards = min(workers, os.path.getsize(jsonl_file_path) // MIN_SHARD_BYTES) or 1
+    ranges = [(jsonl_file_path, start, end, i) for i, (start, end) in enumerate(shard_offsets(jsonl_file_path, shards))]
+    if len(ranges) > 1:
+        with multiprocessing.Pool(len(ranges)) as pool:
+            results = pool.map(_scan_shard, ranges)
+    else:
+        results = [_scan_shard(args) for args in ranges]
+
+    index_keys = []
+    index_offsets = array("q")
+    record_count = 0
+    all_entry_keys = set()
+    lang_names = {}
+    descendant_links = defaultdict(set)
+    for result in results:
+        # Earlier shards hold earlier offsets: keep the first occurrence of each key.
+        for key, offset in zip(result["keys"], result["offsets"]):
+            if key not in all_entry_keys:
+                all_entry_keys.add(key)
+                index_keys.append(f"{key[0]}_{key[1]}")
+                index_offsets.append(offset)
+        record_count += result["record_count"]
+        for lang_code, lang_name in result["lang_names"].items():
+            lang_names.setdefault(lang_code, lang_name)
+        for key, children in result["descendant_links"].items():
+            descendant_links[key] |= children
+    longest_chains_heap = heapq.nlargest(TOP_N, (item for r in results for item in r["longest_chains"]))
+    most_translations_heap = heapq.nlargest(TOP_N, (item for r in results for item in r["most_translations"]))
+    del results
+
+    # Save index (JSON for tooling, packed table for fast server startup)
+    save_index_to_json(index_keys, index_offsets, index_output_path)
+    write_packed_index(index_keys, index_offsets, INDEX_KEYS_OUTPUT_PATH, INDEX_OFFSETS_OUTPUT_PATH)
+    del index_keys, index_offsets
+
+    # Language names come from the same scan, so build_language_codes.py only has to
+    # fill in codes that are still missing afterwards.
+    save_language_codes(lang_names, LANG_MAP_OUTPUT_PATH)
 
     # Save most translations
     most_translations_sorted = sorted(most_translations_heap, reverse=True)
@@ -218,16 +437,17 @@ def build_index_from_jsonl(jsonl_file_path: str, index_output_path: str) -> None
     # write an empty file so startup can still complete.
     try:
         descendant_counts = compute_descendant_counts(descendant_links)
-        reverse_descendant_graph = {key: sorted(values) for key, values in descendant_links.items()}
+        reverse_descendant_graph = _reverse_descendant_graph(descendant_links)
         save_json(reverse_descendant_graph, REVERSE_DESCENDANT_GRAPH_OUTPUT_PATH)
         descendant_count_heap = []
         for key in tqdm(all_entry_keys, desc="Counting descendants"):
             count = descendant_counts.get(key, 0)
             if count > 0:
-                word, lang_code = key.rsplit("_", 1)
-                heapq.heappush(descendant_count_heap, (count, word, lang_code))
-                if len(descendant_count_heap) > TOP_N:
-                    heapq.heappop(descendant_count_heap)
+                word, lang_code = key
+                if len(descendant_count_heap) < TOP_N:
+                    heapq.heappush(descendant_count_heap, (count, word, lang_code))
+                elif count >= descendant_count_heap[0][0]:
+                    heapq.heappushpop(descendant_count_heap, (count, word, lang_code))
 
         most_descendants_sorted = sorted(descendant_count_heap, reverse=True)
         most_descendants_output = [
@@ -248,19 +468,52 @@ def build_index_from_jsonl(jsonl_file_path: str, index_output_path: str) -> None
     ]
     save_json(longest_chains_output, LONGEST_ETYMOLOGICAL_CHAINS_OUTPUT_PATH)
 
+    # Written last, so a build interrupted above leaves the previous (mismatching) manifest.
+    save_json(jsonl_fingerprint(jsonl_file_path), INDEX_MANIFEST_OUTPUT_PATH)
+
     print(f"Indexed {record_count} records.")
     print(f"Saved Top {TOP_N} entries with most translations to {MOST_TRANSLATIONS_OUTPUT_PATH}")
     print(f"Saved Top {TOP_N} entries with most descendants to {MOST_DESCENDANTS_OUTPUT_PATH}")
 
-def save_index_to_json(index: defaultdict, output_path: str) -> None:
-    """Serialize the word-lang byte-offset index to JSON."""
-    with open(output_path, "w", encoding="utf-8") as output_file:
-        json.dump(dict(index), output_file)
+def save_index_to_json(keys: list, offsets: array, output_path: str) -> None:
+    """Serialize the word-lang byte-offset index (parallel ``keys``/``offsets``) to JSON.
+
+    Layout: ``{"<word>_<lang_code>": offset}`` with both parts lower-cased and
+    ``offset`` the byte position of the first JSONL line for that pair. This is the
+    flat shape ``constants.load_index`` expects.
+
+    Entries are encoded one at a time and written in buffered chunks, so no copy of
+    the index or full JSON document is held in memory alongside it.
+    """
+    with open(output_path, "wb") as output_file:
+        buf = bytearray(b"{")
+        for i, (key, offset) in enumerate(zip(keys, offsets)):
+            if i:
+                buf += b","
+            buf += orjson.dumps(key)
+            buf += b":%d" % offset
+            if len(buf) >= WRITE_CHUNK_BYTES:
+                output_file.write(buf)
+                buf.clear()
+        buf += b"}"
+        output_file.write(buf)
+
+def save_language_codes(lang_names: dict, output_path: str) -> None:
+    """Add newly seen codes to ``language_codes.json``, keeping existing names, sorted by code."""
+    try:
+        with open(output_path, "rb") as f:
+            existing = orjson.loads(f.read())
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        existing = {}
+    for lang_code, lang_name in lang_names.items():
+        existing.setdefault(lang_code, lang_name)
+    save_json(dict(sorted(existing.items())), output_path)
+    print(f"Saved {len(existing)} language codes to {output_path}")
 
 def save_json(data, output_path: str) -> None:
-    """Generic helper to save a data structure as pretty-printed JSON."""
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    """Generic helper to save a data structure as pretty-printed (UTF-8, unescaped) JSON."""
+    with open(output_path, "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
 
 if __name__ == "__main__":
     build_index_from_jsonl(JSONL_FILE_PATH, INDEX_OUTPUT_PATH)
@@ -6,6 +6,9 @@ from constants import DATA_DIR, INDEX_FILE_PATH, JSONL_FILE_PATH, LANG_MAP_FILE_
 
 """Build a mapping of lang_code -> language name from wiktionary_data.jsonl.
 
+build_index.py already writes language_codes.json from its own scan; this script
+only fills in codes that are still missing (e.g. after an older index build).
+
 Strategy:
  1. Load index to collect all lang codes needed.
  2. Stream JSONL file; for each line grab first occurrence of each lang_code's human name.
@@ -1,28 +1,176 @@
 import os
-import json
+import sys
+import mmap
+import hashlib
+from array import array
+from functools import lru_cache
+import orjson
 
 # === Base paths ===
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 
 # === File paths ===
 INDEX_FILE_PATH = os.path.join(DATA_DIR, "wiktionary_index.json")
+# Packed form of the same index written by build_index.py: NUL-separated keys in file
+# order, and a parallel array of native int64 byte offsets.
+INDEX_KEYS_FILE_PATH = os.path.join(DATA_DIR, "wiktionary_index.keys")
+INDEX_OFFSETS_FILE_PATH = os.path.join(DATA_DIR, "wiktionary_index.offsets")
 JSONL_FILE_PATH = os.path.join(DATA_DIR, "wiktionary_data.jsonl")
 LANG_MAP_FILE_PATH = os.path.join(DATA_DIR, "language_codes.json")
 REVERSE_DESCENDANT_GRAPH_FILE_PATH = os.path.join(DATA_DIR, "reverse_descendant_graph.json")
+IPA_CACHE_FILE_PATH = os.path.join(DATA_DIR, "ipa_cache.sqlite3")
+# Fingerprint of the JSONL file the index files were built from (written by build_index.py).
+INDEX_MANIFEST_FILE_PATH = os.path.join(DATA_DIR, "index_manifest.json")
+RANDOM_POOL_FILE_PATHS = {
+    "most_translations": os.path.join(DATA_DIR, "most_translations.json"),
+    "most_descendants": os.path.join(DATA_DIR, "most_descendants.json"),
+}
 
 # === Global caches ===
 index = {}
 lang_code_to_name = {}
+# word -> index keys for that word across languages, in index (file) order.
+word_to_keys = {}
+# word -> sorted, de-duplicated language codes that word has entries in.
+word_to_langs = {}
+# category -> entries served by /random-interesting-word (non-empty pools only).
+random_pools = {}
+
+# Parsed JSONL entries kept per byte offset, shared by all routes.
+ENTRY_CACHE_SIZE = 16384
+# Request (word, lang_code) pairs whose index key strings are kept for reuse.
+INDEX_KEY_CACHE_SIZE = 65536
+# Bytes past a record's start to ask the kernel to read ahead when prefetching it.
+ENTRY_PREFETCH_BYTES = 16 * 1024
+# Leading bytes of the JSONL file hashed into the index manifest.
+MANIFEST_HEAD_BYTES = 1024 * 1024
+_jsonl_file = None
+_jsonl_mm = None
+
+def _read_packed_index():
+    """Return `(keys, offsets)` from the packed index files, or None if they are unusable.
+
+    The packed files are skipped when missing, older than the JSON index, or when the
+    key and offset counts disagree.
+    """
+    try:
+        if os.path.getmtime(INDEX_KEYS_FILE_PATH) < os.path.getmtime(INDEX_FILE_PATH):
+            return None
+    except FileNotFoundError:
+        if not os.path.exists(INDEX_KEYS_FILE_PATH):
+            return None
+    try:
+        with open(INDEX_KEYS_FILE_PATH, "rb") as f:
+            text = f.read().decode("utf-8")
+        offsets = array("q")
+        with open(INDEX_OFFSETS_FILE_PATH, "rb") as f:
+            offsets.frombytes(f.read())
+    except (FileNotFoundError, UnicodeDecodeError, ValueError):
+        return None
+    keys = text.split("\0") if text else []
+    if len(keys) != len(offsets):
+        print("⚠️ Packed index files are inconsistent; falling back to JSON index.")
+        return None
+    return keys, offsets
+
+
+def write_packed_index(keys, offsets, keys_path=INDEX_KEYS_FILE_PATH, offsets_path=INDEX_OFFSETS_FILE_PATH):
+    """Write parallel `keys`/`offsets` as the packed key/offset files read by `load_index`.
+
+    Offsets are written first so the keys file is always the newer of the two.
+    """
+    if not isinstance(offsets, array) or offsets.typecode != "q":
+        offsets = array("q", offsets)
+    with open(offsets_path, "wb") as f:
+        offsets.tofile(f)
+    with open(keys_path, "wb") as f:
+        f.write("\0".join(keys).encode("utf-8"))
+
+
+def jsonl_fingerprint(path=JSONL_FILE_PATH) -> dict:
+    """Identify a JSONL data file by size, mtime and a hash of its first MiB."""
+    st = os.stat(path)
+    with open(path, "rb") as f:
+        head_hash = hashlib.blake2b(f.read(MANIFEST_HEAD_BYTES), digest_size=16).hexdigest()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "head_hash": head_hash}
+
+
+def index_manifest_matches() -> bool:
+    """Return False only if the index manifest shows a different JSONL file than the current one.
+
+    A missing manifest (index built before manifests existed) or missing JSONL file
+    gives no evidence of a change, so the existing index files are trusted.
+    """
+    try:
+        with open(INDEX_MANIFEST_FILE_PATH, "rb") as f:
+            manifest = orjson.loads(f.read())
+        return manifest == jsonl_fingerprint(JSONL_FILE_PATH)
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        return True
+
 
 def load_index():
-    """Load JSON word index from file."""
+    """Load the word index from file.
+
+    The packed key/offset files are preferred: they load without a JSON parse or an
+    intermediate dict. Otherwise values from the JSON index are normalized to a flat
+    `key -> int offset` map (older index files stored a list of offsets per key, of
+    which only the first is ever used) and the packed files are written from it.
+    """
     global index
+    packed = _read_packed_index()
+    if packed is not None:
+        index.update(zip(*packed))
+        print(f"✅ Loaded packed index with {len(index)} entries.")
+        build_word_index()
+        return
     try:
-        with open(INDEX_FILE_PATH, "r", encoding="utf-8") as f:
-            index.update(json.load(f))
+        with open(INDEX_FILE_PATH, "rb") as f:
+            raw = orjson.loads(f.read())
+        for key, value in raw.items():
+            if isinstance(value, (list, tuple)):
+                if not value:
+                    continue
+                value = value[0]
+            index[key] = int(value)
         print(f"✅ Loaded index with {len(index)} entries.")
     except FileNotFoundError:
         print("❌ Index file not found at:", INDEX_FILE_PATH)
+        build_word_index()
+        return
+    del raw
+    # Convert once so later startups skip the JSON parse and its memory spike.
+    try:
+        write_packed_index(index.keys(), index.values(), INDEX_KEYS_FILE_PATH, INDEX_OFFSETS_FILE_PATH)
+        print("✅ Wrote packed index files for faster startup.")
+    except OSError as e:
+        print(f"⚠️ Could not write packed index files: {e}")
+    build_word_index()
+
+
+def build_word_index():
+    """Rebuild `word_to_keys` and `word_to_langs` from `index` so per-word lookups never scan every key."""
+    word_to_keys.clear()
+    word_to_langs.clear()
+    langs = {}
+    for key in index:
+        word, sep, lang = key.rpartition("_")
+        if sep:
+            word_to_keys.setdefault(word, []).append(key)
+            # Only a few thousand distinct codes exist; share one string object per code.
+            langs.setdefault(word, set()).add(sys.intern(lang))
+    for word, codes in langs.items():
+        word_to_langs[word] = tuple(sorted(codes))
+
+
+@lru_cache(maxsize=INDEX_KEY_CACHE_SIZE)
+def index_key(word: str, lang_code: str) -> str:
+    """Return the `index` key (`<word>_<lang>`, lower-cased) for a word/language pair.
+
+    Memoized so repeated lookups reuse one key string, and its cached hash, instead of
+    lower-casing and formatting a fresh one on every request.
+    """
+    return f"{word.lower()}_{lang_code.lower()}"
 
 
 def load_language_code_map():
@@ -32,10 +180,90 @@ def load_language_code_map():
     """
     global lang_code_to_name
     try:
-        with open(LANG_MAP_FILE_PATH, 'r', encoding='utf-8') as f:
-            lang_code_to_name.update(json.load(f))
+        with open(LANG_MAP_FILE_PATH, 'rb') as f:
+            lang_code_to_name.update(orjson.loads(f.read()))
         print(f"✅ Loaded {len(lang_code_to_name)} language names.")
     except FileNotFoundError:
         print(f"⚠️ Language codes file not found at {LANG_MAP_FILE_PATH}. Run build_language_codes.py to generate it.")
     except Exception as e:
         print(f"⚠️ Failed to load language codes: {e}")
+
+
+def load_random_pools():
+    """Load the precomputed "interesting word" lists once so random picks never touch disk."""
+    random_pools.clear()
+    for category, path in RANDOM_POOL_FILE_PATHS.items():
+        try:
+            with open(path, "rb") as f:
+                entries = orjson.loads(f.read())
+        except FileNotFoundError:
+            print(f"⚠️ Random pool file not found at {path}.")
+            continue
+        if entries:
+            random_pools[category] = entries
+    print(f"✅ Loaded {len(random_pools)} random word pools.")
+
+
+def get_jsonl_mmap():
+    """Return the process-wide read-only mmap of the JSONL data file, opening it on first use."""
+    global _jsonl_file, _jsonl_mm
+    if _jsonl_mm is None:
+        _jsonl_file = open(JSONL_FILE_PATH, "rb")
+        _jsonl_mm = mmap.mmap(_jsonl_file.fileno(), 0, access=mmap.ACCESS_READ)
+        # Lookups seek to index offsets, so default sequential readahead only wastes I/O.
+        if hasattr(mmap, "MADV_RANDOM"):
+            _jsonl_mm.madvise(mmap.MADV_RANDOM)
+    return _jsonl_mm
+
+
+def prefetch_offsets(offsets):
+    """Ask the kernel to start paging in the records at `offsets` before they are read."""
+    if not hasattr(mmap, "MADV_WILLNEED"):
+        return
+    mm = get_jsonl_mmap()
+    size = len(mm)
+    for offset in offsets:
+        start = offset - (offset % mmap.PAGESIZE)
+        length = min(offset - start + ENTRY_PREFETCH_BYTES, size - start)
+        if length > 0:
+            mm.madvise(mmap.MADV_WILLNEED, start, length)
+
+
+def open_jsonl_mmap():
+    """Map the JSONL data file once at startup so requests never open or map it themselves."""
+    try:
+        mm = get_jsonl_mmap()
+        print(f"✅ Mapped JSONL data file ({len(mm)} bytes).")
+    except FileNotFoundError:
+        print("❌ JSONL data file not found at:", JSONL_FILE_PATH)
+    except ValueError as e:
+        print(f"⚠️ Could not map JSONL data file: {e}")
+
+
+def close_jsonl_mmap():
+    """Unmap the JSONL data file and drop the parsed-entry cache (lifespan shutdown)."""
+    global _jsonl_file, _jsonl_mm
+    if _jsonl_mm is not None:
+        _jsonl_mm.close()
+    if _jsonl_file is not None:
+        _jsonl_file.close()
+    _jsonl_file = None
+    _jsonl_mm = None
+    load_entry_by_offset.cache_clear()
+
+
+def read_entry_line(offset: int) -> bytes:
+    """Return the raw JSONL record starting at `offset` (without the trailing newline)."""
+    mm = get_jsonl_mmap()
+    end = mm.find(b"\n", offset)
+    return mm[offset:end if end != -1 else len(mm)]
+
+
+@lru_cache(maxsize=ENTRY_CACHE_SIZE)
+def load_entry_by_offset(offset: int) -> dict:
+    """Parse the JSONL record at `offset`, caching the result.
+
+    The returned dict is shared between callers; copy it before mutating.
+    """
+    return orjson.loads(read_entry_line(offset))
+
@@ -1,15 +1,20 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 import sys
+import asyncio
 import subprocess
 import os
-import signal
+from dotenv import load_dotenv
+
+load_dotenv()
 
 from api_routes import word_data, descendants
 # TODO [HIGH LEVEL]: Add routers for AI suggestions, KWIC examples, user-corpus uploads, and GeoJSON utilities.
 # TODO [LOW LEVEL]: Implement modules `api_routes/ai_tools.py`, `api_routes/kwic.py`, `api_routes/user_corpus.py`, `api_routes/geojson.py` and include them.
-from constants import load_index, load_language_code_map, LANG_MAP_FILE_PATH
+from constants import index_manifest_matches, load_index, load_language_code_map, load_random_pools, open_jsonl_mmap, close_jsonl_mmap, LANG_MAP_FILE_PATH
+from services.wiktionary_io import clear_hierarchy_cache
 
 # Helper: check and (re)build main index and stats if needed or requested
 def ensure_main_index(rebuild=False):
@@ -23,11 +28,14 @@ def ensure_main_index(rebuild=False):
     backend_dir = os.path.dirname(os.path.abspath(__file__))
     if rebuild or not all(os.path.exists(f) for f in required_files):
         print("[INFO] Building main index and stats files...")
-        subprocess.run([
-            sys.executable, os.path.join(backend_dir, "build_index.py")
-        ], check=True, cwd=backend_dir)
+    elif not index_manifest_matches():
+        print("[INFO] JSONL data changed since the index was built. Rebuilding index and stats files...")
     else:
         print("[INFO] Main index and stats files already exist. Skipping rebuild.")
+        return
+    subprocess.run([
+        sys.executable, os.path.join(backend_dir, "build_index.py")
+    ], check=True, cwd=backend_dir)
 
 def get_rebuild_flag() -> bool:
     """Return True if index rebuild is requested via CLI args."""
@@ -56,13 +64,23 @@ async def lifespan(app: FastAPI):
     """FastAPI lifespan handler: setup and teardown logic."""
     rebuild_index = get_rebuild_flag()
     rebuild_lang_codes = get_rebuild_language_codes_flag()
-    ensure_main_index(rebuild_index)
+    # Index builds shell out for minutes; keep the event loop free while they run.
+    await asyncio.to_thread(ensure_main_index, rebuild_index)
     load_index()
-    ensure_language_codes(rebuild_lang_codes)
+    load_random_pools()
+    open_jsonl_mmap()
+    # Parse the prebuilt descendant graph now rather than on the first tree request.
+    descendants.load_reverse_descendant_graph()
+    await asyncio.to_thread(ensure_language_codes, rebuild_lang_codes)
     yield
+    clear_hierarchy_cache()
+    close_jsonl_mmap()
+    await word_data.close_http_client()
+    await word_data.close_openai_client()
+    word_data.close_ipa_cache()
     print("[INFO] FastAPI backend is shutting down. Cleanup complete.")
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # CORS configuration: set ALLOWED_ORIGINS env (comma-separated) for production
 allowed_origins_env = os.getenv("ALLOWED_ORIGINS", "*")
@@ -106,4 +124,5 @@ if __name__ == "__main__":
         print("[INFO] Language codes rebuild complete.")
     else:
         import uvicorn
-        uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+        # "auto" picks uvloop where it is installed; it is not available on Windows.
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True, loop="auto", http="httptools")
@@ -1,14 +1,21 @@
-import json
 import logging
 import unicodedata
-from constants import index
+from collections import OrderedDict
+from functools import lru_cache
+import orjson
+from constants import index, index_key, word_to_keys, prefetch_offsets, load_entry_by_offset
 
 # Configure basic logging for debugging when running locally.
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("wiktionary_io")
 
+# Total descendant nodes across the finished hierarchies kept between requests.
+HIERARCHY_CACHE_MAX_NODES = 200_000
+# Distinct words whose lookup variants (lower-cased, accent-stripped) are kept for reuse.
+WORD_VARIANT_CACHE_SIZE = 65536
 
-def find_root_ancestor(entry, mmapped_file):
+
+def find_root_ancestor(entry):
     visited = set()
     current = entry
     while True:
@@ -23,16 +30,12 @@ def find_root_ancestor(entry, mmapped_file):
         visited.add(head)
         found_next = False
         for head_key in _index_word_variants(head):
-            for key in index:
-                if key.startswith(f"{head_key}_"):
-                    v = index.get(key)
-                    offset = v[0] if isinstance(v, (list, tuple)) and v else v
-                    mmapped_file.seek(offset)
-                    next_entry = json.loads(mmapped_file.readline().decode("utf-8"))
-                    if "etymology_text" in next_entry:
-                        current = next_entry
-                        found_next = True
-                        break
+            for key in word_to_keys.get(head_key, ()):
+                next_entry = load_entry_by_offset(index[key])
+                if "etymology_text" in next_entry:
+                    current = next_entry
+                    found_next = True
+                    break
             if found_next:
                 break
         if not found_next:
@@ -46,15 +49,16 @@ def _normalize_for_match(s):
     return str(s).strip().lower()
 
 
+@lru_cache(maxsize=WORD_VARIANT_CACHE_SIZE)
 def _index_word_variants(s):
+    # Descendant walks look up the same words over and over; memoize the NFKD pass.
     if not s:
-        return []
+        return ()
     raw = str(s).strip().lower()
-    variants = [raw]
     stripped = "".join(ch for ch in unicodedata.normalize("NFKD", raw) if unicodedata.category(ch) != "Mn")
     if stripped and stripped != raw:
-        variants.append(stripped)
-    return variants
+        return raw, stripped
+    return (raw,)
 
 
 def _candidate_index_keys(word, lang_code=None):
@@ -66,11 +70,11 @@ def _candidate_index_keys(word, lang_code=None):
     lang_key = _normalize_for_match(lang_code) if lang_code else None
     for normalized_word in word_variants:
         if lang_key:
-            exact_key = f"{normalized_word}_{lang_key}"
+            exact_key = index_key(normalized_word, lang_key)
             if exact_key in index and exact_key not in candidates:
                 candidates.append(exact_key)
-        for key in index:
-            if key.startswith(f"{normalized_word}_") and key not in candidates:
+        for key in word_to_keys.get(normalized_word, ()):
+            if key not in candidates:
                 candidates.append(key)
     return candidates
 
@@ -94,7 +98,7 @@ def _extract_child_ref_from_descendant(desc):
         return {
             "word": direct_word,
             "lang_code": direct_lang_code,
-            "key": f"{direct_word.lower()}_{direct_lang_code}",
+            "key": index_key(direct_word, direct_lang_code),
             "expansion": desc.get("expansion") or desc.get("lang") or desc.get("roman"),
         }
 
@@ -126,7 +130,7 @@ def _extract_child_ref_from_descendant(desc):
                 return {
                     "word": arg2,
                     "lang_code": arg1_norm,
-                    "key": f"{arg2.lower()}_{arg1_norm}",
+                    "key": index_key(arg2, arg1_norm),
                     "expansion": tpl.get("expansion") or desc.get("text"),
                 }
             # Otherwise, arg2 is likely the language code
@@ -134,7 +138,7 @@ def _extract_child_ref_from_descendant(desc):
                 return {
                     "word": arg1,
                     "lang_code": arg2_norm,
-                    "key": f"{arg1.lower()}_{arg2_norm}",
+                    "key": index_key(arg1, arg2_norm),
                     "expansion": tpl.get("expansion") or desc.get("text"),
                 }
         
@@ -145,7 +149,7 @@ def _extract_child_ref_from_descendant(desc):
             return {
                 "word": arg1,
                 "lang_code": lang_arg,
-                "key": f"{arg1.lower()}_{lang_arg}",
+                "key": index_key(arg1, lang_arg),
                 "expansion": tpl.get("expansion") or desc.get("text"),
             }
         
@@ -169,7 +173,7 @@ def _extract_child_ref_from_descendant(desc):
             return {
                 "word": child_word,
                 "lang_code": lang_code,
-                "key": f"{child_word.lower()}_{lang_code}",
+                "key": index_key(child_word, lang_code),
             }
     
     return None
@@ -199,23 +203,26 @@ def _child_refs_from_entry(entry, max_per_step=32):
     return child_refs
 
 
-def _read_entry_for_word(f, word, lang_code=None):
+def _read_entry_for_word(word, lang_code=None):
     for key in _candidate_index_keys(word, lang_code):
         try:
-            offset = index.get(key)
-            if isinstance(offset, (list, tuple)) and offset:
-                offset = offset[0]
-            f.seek(offset)
-            entry = json.loads(f.readline().decode("utf-8"))
+            entry = load_entry_by_offset(index[key])
             return key, entry
         except Exception:
             continue
     return None, None
 
 
+def _descendant_frame(word, entry, depth, results):
+    """Return a DFS stack frame expanding the descendants listed in `entry`."""
+    child_refs = _child_refs_from_entry(entry)
+    # Children are read one after another below; let the kernel fetch their pages meanwhile.
+    prefetch_offsets(index[ref["key"]] for ref in child_refs if ref["key"] in index)
+    return word, depth, results, iter(child_refs), set()
+
+
 def build_descendant_hierarchy(
     word,
-    f,
     lang_code=None,
     depth=0,
     visited=None,
@@ -227,9 +234,12 @@ def build_descendant_hierarchy(
 
     Returns a dict: {"name": word, "children": [ {"word":..., "lang_code":..., "expansion":..., "children": [...]}, ... ] }
 
-    - `f` should be an open file-like object supporting `seek()` and `readline()` (mmap is preferred).
+    - Entries are sliced out of the process-wide JSONL mapping, so no file handle or
+      cursor is threaded through the walk.
+    - The walk is a depth-first traversal over an explicit stack; each child entry is
+      resolved once and its descendants are expanded from that same entry.
     - `visited` is a set of index keys already processed to avoid cycles.
-    - `max_depth` prevents runaway recursion on noisy data.
+    - `max_depth` prevents runaway expansion on noisy data.
     - `node_budget` is a mutable dict like {"remaining": int, "truncated": bool} to bound work.
     """
     if visited is None:
@@ -246,23 +256,35 @@ def build_descendant_hierarchy(
         node_budget["truncated"] = True
         return {"name": word, "children": []}
 
-    results = []
-
     logger.info("build_descendant_hierarchy target=%r lang_code=%r depth=%d", word, lang_code, depth)
 
-    current_key, current_entry = _read_entry_for_word(f, word, lang_code)
+    current_key, current_entry = _read_entry_for_word(word, lang_code)
     if not current_entry:
         logger.info("no descendant entry found for %r (%r)", word, lang_code)
         return {"name": word, "children": []}
 
-    seen_children = set()
-    for child_ref in _child_refs_from_entry(current_entry):
+    results = []
+    stack = [_descendant_frame(word, current_entry, depth, results)]
+    while stack:
+        frame_word, frame_depth, frame_results, child_refs, seen_children = stack[-1]
+
+        # The budget may have run out inside the previous child's subtree.
+        if node_budget.get("remaining", 0) <= 0:
+            node_budget["truncated"] = True
+            child_ref = None
+        else:
+            child_ref = next(child_refs, None)
+        if child_ref is None:
+            logger.info("finished %r: found %d children at depth %d", frame_word, len(frame_results), frame_depth)
+            stack.pop()
+            continue
+
         child_word = child_ref.get("word")
         child_lang = child_ref.get("lang_code")
         if not child_word:
             continue
 
-        child_key, child_entry = _read_entry_for_word(f, child_word, child_lang)
+        child_key, child_entry = _read_entry_for_word(child_word, child_lang)
         if not child_entry:
             continue
 
@@ -277,31 +299,71 @@ def build_descendant_hierarchy(
 
         child_word = child_entry.get("word")
         child_lang = child_entry.get("lang_code")
-        child_exp = child_entry.get("expansion") or child_ref.get("expansion")
-        child_tree = build_descendant_hierarchy(
-            child_word,
-            f,
-            lang_code=child_lang,
-            depth=depth + 1,
-            visited=visited,
-            max_depth=max_depth,
-            node_budget=node_budget,
-        )
-
-        logger.debug("built child tree for %r lang=%r -> %d children", child_word, child_lang, len(child_tree.get("children", [])))
-
-        results.append(
-            {
-                "word": child_word,
-                "lang_code": child_lang,
-                "expansion": child_exp,
-                "children": child_tree.get("children", []),
-            }
-        )
+        child_node = {
+            "word": child_word,
+            "lang_code": child_lang,
+            "expansion": child_entry.get("expansion") or child_ref.get("expansion"),
+            "children": [],
+        }
+        frame_results.append(child_node)
 
+        child_depth = frame_depth + 1
+        if child_depth >= max_depth:
+            logger.info("max_depth reached for %s at depth %d", child_word, child_depth)
+            continue
         if node_budget.get("remaining", 0) <= 0:
             node_budget["truncated"] = True
-            break
+            continue
+
+        logger.info("build_descendant_hierarchy target=%r lang_code=%r depth=%d", child_word, child_lang, child_depth)
+        stack.append(_descendant_frame(child_word, child_entry, child_depth, child_node["children"]))
 
-    logger.info("finished %r: found %d children at depth %d", word, len(results), depth)
     return {"name": word, "children": results}
+
+
+# (word, lang_code, max_depth, max_nodes) -> (serialized tree, truncated, node count), oldest first.
+_hierarchy_cache = OrderedDict()
+_hierarchy_cache_nodes = 0
+
+
+def descendant_hierarchy(word, lang_code=None, max_depth=50, max_nodes=2000):
+    """
+    Memoized `build_descendant_hierarchy` over the shared JSONL mapping.
+
+    Returns `(tree, truncated)`. The result depends on the depth and node bounds, so
+    those are part of the cache key alongside `(word, lang_code)`. Trees are cached as
+    orjson bytes and every call gets its own freshly decoded copy, so callers may
+    modify it. Least recently used trees are dropped once the cached trees hold more
+    than `HIERARCHY_CACHE_MAX_NODES` nodes in total.
+    """
+    global _hierarchy_cache_nodes
+    key = (word, lang_code, max_depth, max_nodes)
+    cached = _hierarchy_cache.get(key)
+    if cached is not None:
+        _hierarchy_cache.move_to_end(key)
+        return orjson.loads(cached[0]), cached[1]
+
+    budget = {"remaining": max_nodes, "truncated": False}
+    tree = build_descendant_hierarchy(
+        word,
+        lang_code=lang_code,
+        max_depth=max_depth,
+        node_budget=budget,
+    )
+    truncated = bool(budget.get("truncated"))
+    # Every node below the root took one unit of the budget.
+    nodes = max_nodes - budget.get("remaining", 0) + 1
+    if nodes <= HIERARCHY_CACHE_MAX_NODES:
+        _hierarchy_cache[key] = (orjson.dumps(tree), truncated, nodes)
+        _hierarchy_cache_nodes += nodes
+        while _hierarchy_cache_nodes > HIERARCHY_CACHE_MAX_NODES:
+            _, (_, _, evicted) = _hierarchy_cache.popitem(last=False)
+            _hierarchy_cache_nodes -= evicted
+    return tree, truncated
+
+
+def clear_hierarchy_cache():
+    """Forget memoized hierarchies (lifespan shutdown)."""
+    global _hierarchy_cache_nodes
+    _hierarchy_cache.clear()
+    _hierarchy_cache_nodes = 0
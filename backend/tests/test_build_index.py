@@ -11,7 +11,7 @@ import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from build_index import compute_descendant_counts
+from build_index import _graph_key, _reverse_descendant_graph, compute_descendant_counts, scan_range, shard_offsets
 
 
 def test_tree_counts_subtree_sizes():
@@ -89,3 +89,52 @@ def test_deterministic_regardless_of_input_order():
         reversed_insertion.setdefault(p, set()).add(c)
 
     assert compute_descendant_counts(forward) == compute_descendant_counts(reversed_insertion)
+
+
+def test_shards_cover_every_line_once_with_absolute_offsets(tmp_path):
+    """Line-aligned shards must index the same records and offsets as one full scan."""
+    lines = [
+        f'{{"word": "w{i}", "lang_code": "l{i % 3}", "translations": [{"1, " * (i % 4)}0]}}'
+        for i in range(40)
+    ]
+    path = tmp_path / "data.jsonl"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    whole = scan_range(str(path), 0, path.stat().st_size)
+    ranges = shard_offsets(str(path), 7)
+    assert len(ranges) > 1
+    assert ranges[0][0] == 0 and ranges[-1][1] == path.stat().st_size
+    assert all(a_end == b_start for (_, a_end), (b_start, _) in zip(ranges, ranges[1:]))
+
+    merged = {}
+    count = 0
+    for start, end in ranges:
+        part = scan_range(str(path), start, end)
+        for key, offset in zip(part["keys"], part["offsets"]):
+            merged.setdefault(key, offset)
+        count += part["record_count"]
+    assert count == whole["record_count"] == 40
+    assert list(merged.items()) == list(zip(whole["keys"], whole["offsets"]))
+
+
+def test_descendant_without_language_stays_apart_from_bare_word_node(tmp_path):
+    """A ``": foo"`` descendant is the node ``foo_``, not the bare-word node ``foo``."""
+    lines = [
+        '{"word": "foo", "lang_code": "en", "descendants": [{"text": ": bar"}]}',
+        '{"word": "baz", "lang_code": "en", "descendants": [{"text": ": foo"}]}',
+    ]
+    path = tmp_path / "data.jsonl"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    links = scan_range(str(path), 0, path.stat().st_size)["descendant_links"]
+    graph = {_graph_key(key): sorted(map(_graph_key, children)) for key, children in links.items()}
+
+    assert graph == {"foo_en": ["bar_"], "foo": ["bar_"], "baz_en": ["foo_"], "baz": ["foo_"]}
+    counts = compute_descendant_counts(links)
+    assert counts[("baz",)] == 1
+
+
+def test_reverse_graph_merges_nodes_that_format_to_the_same_key():
+    links = {("a_b",): {("x", "en")}, ("a", "b"): {("y", "en")}}
+
+    assert _reverse_descendant_graph(links) == {"a_b": ["x_en", "y_en"]}
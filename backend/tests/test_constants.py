@@ -0,0 +1,95 @@
+"""Tests for loading the word index (JSON and packed key/offset files) and checking its manifest."""
+
+import os
+import sys
+
+import orjson
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import constants
+
+
+def _use_index_files(monkeypatch, tmp_path):
+    paths = {
+        "INDEX_FILE_PATH": tmp_path / "wiktionary_index.json",
+        "INDEX_KEYS_FILE_PATH": tmp_path / "wiktionary_index.keys",
+        "INDEX_OFFSETS_FILE_PATH": tmp_path / "wiktionary_index.offsets",
+    }
+    for name, path in paths.items():
+        monkeypatch.setattr(constants, name, str(path))
+    monkeypatch.setattr(constants, "index", {})
+    monkeypatch.setattr(constants, "word_to_keys", {})
+    monkeypatch.setattr(constants, "word_to_langs", {})
+    return paths
+
+
+def test_list_valued_json_index_is_flattened_and_packed(monkeypatch, tmp_path):
+    paths = _use_index_files(monkeypatch, tmp_path)
+    paths["INDEX_FILE_PATH"].write_bytes(orjson.dumps({"licht_de": [5, 9], "licht_nl": 7, "empty_en": []}))
+
+    constants.load_index()
+
+    assert constants.index == {"licht_de": 5, "licht_nl": 7}
+    assert constants.word_to_keys == {"licht": ["licht_de", "licht_nl"]}
+    assert constants._read_packed_index() == (["licht_de", "licht_nl"], constants.array("q", [5, 7]))
+
+    # A second load is served from the packed files alone.
+    paths["INDEX_FILE_PATH"].unlink()
+    constants.index.clear()
+    constants.load_index()
+    assert constants.index == {"licht_de": 5, "licht_nl": 7}
+
+
+def test_packed_index_older_than_json_index_is_ignored(monkeypatch, tmp_path):
+    paths = _use_index_files(monkeypatch, tmp_path)
+    constants.write_packed_index(["old_en"], [1], paths["INDEX_KEYS_FILE_PATH"], paths["INDEX_OFFSETS_FILE_PATH"])
+    paths["INDEX_FILE_PATH"].write_bytes(orjson.dumps({"new_en": 2}))
+    os.utime(paths["INDEX_KEYS_FILE_PATH"], ns=(1_000_000_000, 1_000_000_000))
+
+    assert constants._read_packed_index() is None
+    constants.load_index()
+    assert constants.index == {"new_en": 2}
+
+
+def test_packed_index_with_mismatched_counts_is_ignored(monkeypatch, tmp_path):
+    paths = _use_index_files(monkeypatch, tmp_path)
+    constants.write_packed_index(["a_en", "b_en"], [1, 2], paths["INDEX_KEYS_FILE_PATH"], paths["INDEX_OFFSETS_FILE_PATH"])
+    paths["INDEX_KEYS_FILE_PATH"].write_bytes(b"a_en\0b_en\0c_en")
+
+    assert constants._read_packed_index() is None
+
+
+def _use_manifest_files(monkeypatch, tmp_path):
+    jsonl_path = tmp_path / "wiktionary_data.jsonl"
+    manifest_path = tmp_path / "index_manifest.json"
+    monkeypatch.setattr(constants, "JSONL_FILE_PATH", str(jsonl_path))
+    monkeypatch.setattr(constants, "INDEX_MANIFEST_FILE_PATH", str(manifest_path))
+    return jsonl_path, manifest_path
+
+
+def test_index_manifest_matches_unchanged_jsonl(monkeypatch, tmp_path):
+    jsonl_path, manifest_path = _use_manifest_files(monkeypatch, tmp_path)
+    jsonl_path.write_bytes(b'{"word": "licht", "lang_code": "de"}\n')
+    manifest_path.write_bytes(orjson.dumps(constants.jsonl_fingerprint(str(jsonl_path))))
+
+    assert constants.index_manifest_matches() is True
+
+
+def test_index_manifest_mismatch_after_jsonl_changes(monkeypatch, tmp_path):
+    jsonl_path, manifest_path = _use_manifest_files(monkeypatch, tmp_path)
+    jsonl_path.write_bytes(b'{"word": "licht", "lang_code": "de"}\n')
+    manifest_path.write_bytes(orjson.dumps(constants.jsonl_fingerprint(str(jsonl_path))))
+    jsonl_path.write_bytes(b'{"word": "licht", "lang_code": "nl"}\n')
+
+    assert constants.index_manifest_matches() is False
+
+
+def test_missing_manifest_or_jsonl_trusts_existing_index(monkeypatch, tmp_path):
+    jsonl_path, manifest_path = _use_manifest_files(monkeypatch, tmp_path)
+    jsonl_path.write_bytes(b'{"word": "licht", "lang_code": "de"}\n')
+    assert constants.index_manifest_matches() is True
+
+    manifest_path.write_bytes(orjson.dumps(constants.jsonl_fingerprint(str(jsonl_path))))
+    jsonl_path.unlink()
+    assert constants.index_manifest_matches() is True
@@ -2,6 +2,8 @@ import os
 import sys
 import types
 
+import orjson
+
 fastapi_mod = types.ModuleType("fastapi")
 
 class _Query:
@@ -9,18 +11,32 @@ class _Query:
         pass
 
 fastapi_mod.Query = _Query
+fastapi_mod.Body = _Query
+fastapi_mod.Request = object
 fastapi_mod.APIRouter = lambda *args, **kwargs: types.SimpleNamespace(get=lambda *a, **k: (lambda f: f))
 sys.modules.setdefault("fastapi", fastapi_mod)
 
 responses_mod = types.ModuleType("fastapi.responses")
 
 class _JSONResponse:
-    def __init__(self, *args, **kwargs):
-        pass
+    def __init__(self, content=None, *args, **kwargs):
+        self.body = orjson.dumps(content) if isinstance(content, (dict, list)) else b""
 
 responses_mod.JSONResponse = _JSONResponse
+responses_mod.ORJSONResponse = _JSONResponse
+responses_mod.StreamingResponse = _JSONResponse
+responses_mod.Response = _JSONResponse
 sys.modules.setdefault("fastapi.responses", responses_mod)
 
+openai_mod = types.ModuleType("openai")
+openai_mod.AsyncOpenAI = object
+sys.modules.setdefault("openai", openai_mod)
+
+httpx_mod = types.ModuleType("httpx")
+httpx_mod.AsyncClient = lambda *args, **kwargs: None
+httpx_mod.Limits = lambda *args, **kwargs: None
+sys.modules.setdefault("httpx", httpx_mod)
+
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from api_routes import descendants as descendants_api
@@ -42,7 +58,7 @@ def test_light_entry_exposes_root_template_for_proto_chain():
         ],
     }
 
-    parents = descendants_api._candidate_parent_nodes(None, entry, max_per_step=8)
+    parents = descendants_api._candidate_parent_nodes(entry, max_per_step=8)
     assert any(parent["word"] == "*lewk-" for parent in parents)
 
 
@@ -52,3 +68,178 @@ def test_proto_form_matches_index_entry_without_star():
     matches = descendants_api._find_index_keys_for_word("*lewk-", "ine-pro", max_keys=10)
 
     assert matches == ["lewk-_ine-pro"]
+
+
+def test_prefix_lookup_uses_word_index_in_file_order():
+    descendants_api.index = {"lewk-_ine-pro": 0, "light_enm": 10, "light_en": 20}
+    descendants_api.word_to_keys.clear()
+    descendants_api.word_to_keys.update({"lewk-": ["lewk-_ine-pro"], "light": ["light_enm", "light_en"]})
+
+    assert descendants_api._find_index_key_for("Light") == "light_enm"
+    assert descendants_api._find_index_keys_for_word("light", max_keys=10) == ["light_enm", "light_en"]
+    assert descendants_api._find_index_key_for("missing") is None
+
+
+def test_flatten_paths_keeps_depth_first_leaf_order_and_limit():
+    tree = {
+        "name": "*lewk-",
+        "children": [
+            {"word": "lux", "lang_code": "la", "children": [
+                {"word": "luce", "lang_code": "it", "children": []},
+                {"word": "luz", "lang_code": "es", "children": []},
+            ]},
+            {"word": "leoht", "lang_code": "ang", "children": []},
+        ],
+    }
+
+    paths = descendants_api._flatten_paths_from_tree(tree, root_word="*lewk-", root_lang="ine-pro")
+
+    assert [[n["word"] for n in p] for p in paths] == [
+        ["*lewk-", "lux", "luce"],
+        ["*lewk-", "lux", "luz"],
+        ["*lewk-", "leoht"],
+    ]
+    assert len(descendants_api._flatten_paths_from_tree(tree, root_word="*lewk-", max_paths=2)) == 2
+    assert descendants_api._flatten_paths_from_tree({"children": []}, root_word="x") == [[{"word": "x", "lang_code": None}]]
+
+
+def test_deepest_template_ancestor_prefers_last_explicit_form():
+    templates = [
+        {"name": "inh", "args": {"1": "en", "2": "enm", "3": "light"}},
+        {"name": "inh", "args": {"1": "en", "2": "ine-pro", "3": "*lewk-"}},
+        {"name": "cog", "args": {"1": "de"}},
+        None,
+    ]
+
+    assert descendants_api._deepest_template_ancestor(templates) == ("*lewk-", "ine-pro")
+    assert descendants_api._deepest_template_ancestor([]) == (None, None)
+
+
+def test_ndjson_paths_frames_root_paths_and_meta():
+    tree = {"children": [{"word": "a", "lang_code": "en", "children": []}, {"word": "b", "lang_code": "en"}]}
+    paths = descendants_api._iter_paths_from_tree(tree, "root", "ine-pro")
+    meta = {"max_depth": 8, "max_nodes": 100, "max_paths": 2, "truncated": False}
+
+    lines = [orjson.loads(line) for line in descendants_api._ndjson_paths("root", "ine-pro", paths, meta)]
+
+    assert lines[0] == {"root": "root", "root_lang": "ine-pro"}
+    assert [path[-1]["word"] for path in lines[1:-1]] == ["a", "b"]
+    assert lines[-1]["meta"]["truncated"] is True
+
+
+def test_reverse_tree_expands_shared_children_per_path_and_cuts_cycles():
+    descendants_api._reverse_descendant_graph = {
+        "a_x": {"b_x", "c_x"},
+        "b_x": {"d_x"},
+        "c_x": {"d_x"},
+        "d_x": {"a_x"},
+    }
+    budget = {"remaining": 100, "truncated": False}
+
+    tree = descendants_api._reverse_tree_node("a", "x", max_depth=10, node_budget=budget)
+
+    b, c = tree["children"]
+    assert [child["word"] for child in b["children"]] == ["d"]
+    assert [child["word"] for child in c["children"]] == ["d"]
+    # The root itself is not on the path, so `a` is re-entered once below `d`; from there
+    # only `c` is new, and it stops because `d` is already on the path.
+    revisited_a = b["children"][0]["children"][0]
+    assert revisited_a["children"] == [{"word": "c", "lang_code": "x", "expansion": None, "children": []}]
+    descendants_api._reverse_descendant_graph = None
+
+
+def test_ndjson_tree_nodes_link_children_to_parent_ids():
+    tree = {"name": "root", "children": [{"word": "a", "lang_code": "en", "children": [{"word": "b", "lang_code": "en"}]}, {"word": "c", "lang_code": "fr"}]}
+
+    lines = [orjson.loads(line) for line in descendants_api._ndjson_tree_nodes("root", tree, {"truncated": False})]
+
+    nodes = lines[1:-1]
+    assert [(n["id"], n["parent"], n["word"]) for n in nodes] == [(0, None, "root"), (1, 0, "a"), (2, 1, "b"), (3, 0, "c")]
+    assert lines[-1] == {"meta": {"truncated": False}}
+
+
+def test_find_root_ancestor_follows_heads_through_word_index(monkeypatch):
+    from services import wiktionary_io
+
+    entries = {
+        0: {"word": "licht", "lang_code": "de"},
+        1: {
+            "word": "licht",
+            "lang_code": "nl",
+            "etymology_text": "From Old Dutch.",
+            "head_templates": [{"name": "head", "args": {"head": "licht"}}],
+        },
+    }
+    monkeypatch.setattr(wiktionary_io, "index", {"licht_de": 0, "licht_nl": 1, "lichtje_nl": 2})
+    monkeypatch.setattr(wiktionary_io, "word_to_keys", {"licht": ["licht_de", "licht_nl"], "lichtje": ["lichtje_nl"]})
+    monkeypatch.setattr(wiktionary_io, "load_entry_by_offset", entries.__getitem__)
+
+    entry = {"word": "light", "head_templates": [{"name": "head", "args": {"head": "lícht"}}]}
+
+    assert wiktionary_io.find_root_ancestor(entry) == "licht"
+
+
+def test_aggregated_tree_does_not_leak_into_cached_hierarchy(monkeypatch):
+    import asyncio
+    from services import wiktionary_io
+
+    def fake_hierarchy(word, lang_code=None, max_depth=50, node_budget=None):
+        grandchildren = [{"word": f"g0_{i}", "lang_code": "en", "children": []} for i in range(5)]
+        node_budget["remaining"] -= 6
+        return {"name": word, "children": [{"word": "g0", "lang_code": "en", "children": grandchildren}]}
+
+    monkeypatch.setattr(wiktionary_io, "build_descendant_hierarchy", fake_hierarchy)
+    monkeypatch.setattr(descendants_api, "index", {"root_en": 0})
+    monkeypatch.setattr(descendants_api, "_read_etymology_root", lambda off: ("root", None, {}))
+    monkeypatch.setattr(descendants_api, "_response_cache", {})
+    wiktionary_io.clear_hierarchy_cache()
+
+    for _ in range(3):
+        asyncio.run(descendants_api.descendant_tree_aggregated(
+            word="root", lang_code="en", max_depth=8, max_nodes=100, branch_limit=2, aggregate_depth=1,
+        ))
+    response = asyncio.run(descendants_api.descendant_tree_from_root(word="root", lang_code="en", max_depth=8, max_nodes=100))
+    payload = orjson.loads(response.body)
+
+    wiktionary_io.clear_hierarchy_cache()
+    grandchildren = payload["tree"]["children"][0]["children"]
+    assert [child["word"] for child in grandchildren] == [f"g0_{i}" for i in range(5)]
+
+
+def test_ancestry_chain_starts_with_root_entry_and_its_ipa(monkeypatch):
+    import asyncio
+    from api_routes import word_data
+
+    entries = {
+        ("light", "en"): {
+            "word": "light",
+            "lang_code": "en",
+            "sounds": [{"ipa": "/laɪt/"}, {"ipa": "[ɫaɪt]"}],
+            "etymology_templates": [
+                {"name": "inh", "args": {"1": "en", "2": "enm", "3": "light"}},
+                {"name": "inh", "args": {"1": "en", "2": "ang", "3": "lēoht"}},
+            ],
+        },
+        ("light", "enm"): {"word": "light", "lang_code": "enm", "sounds": [{"ipa": "[liçt]"}]},
+        ("lēoht", "ang"): {"word": "lēoht", "lang_code": "ang"},
+    }
+
+    async def fake_word_data(word, lang_code):
+        return dict(entries[(word, lang_code)])
+
+    async def fake_estimates(items):
+        return [f"[{word}?]" for word, _, _ in items]
+
+    monkeypatch.setattr(word_data, "get_word_data_or_ai", fake_word_data)
+    monkeypatch.setattr(word_data, "ai_estimate_ipa_batch", fake_estimates)
+
+    chain = asyncio.run(word_data.build_ancestry_chain("light", "en"))
+
+    assert [(link["word"], link["lang_code"], link["ipa"]) for link in chain] == [
+        ("light", "en", "[ɫaɪt]"),
+        ("light", "enm", "[liçt]"),
+        ("lēoht", "ang", "[lēoht?]"),
+    ]
+    assert chain[0]["phonemic_ipa"] == "/laɪt/"
+    assert chain[0]["node"]["etymology_templates"] == entries[("light", "en")]["etymology_templates"]
+    assert "ai_estimated_ipa" not in chain[0]["node"]